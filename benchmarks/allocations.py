@@ -0,0 +1,111 @@
+"""Measure the memory allocated and time taken by each injected call."""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+from typing import NewType
+
+from pybooster import injector
+from pybooster import provider
+from pybooster import required
+
+Greeting = NewType("Greeting", str)
+Recipient = NewType("Recipient", str)
+
+
+@provider.function
+def greeting_provider() -> Greeting:
+    return Greeting("Hello")
+
+
+@provider.asyncfunction
+async def recipient_provider() -> Recipient:
+    return Recipient("World")
+
+
+def plain(*, greeting: str = "Hello", recipient: str = "World") -> str:
+    return f"{greeting}, {recipient}!"
+
+
+@injector.function
+def sync_injected(*, greeting: Greeting = required) -> str:
+    return f"{greeting}, World!"
+
+
+@injector.asyncfunction
+async def async_injected(*, greeting: Greeting = required, recipient: Recipient = required) -> str:
+    return f"{greeting}, {recipient}!"
+
+
+def measure(call: Callable[[], Any], count: int) -> tuple[int, int, float]:
+    """Return the peak bytes allocated by one call, bytes retained after many, and seconds per call."""
+    call()  # warm up any caches
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(10):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(count):
+            call()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(count):
+        call()
+    return min(peaks), retained, (time.perf_counter() - start) / count
+
+
+def run_coroutine(func: Callable[[], Any]) -> Callable[[], Any]:
+    # drive the coroutine by hand so the event loop's own allocations are not counted
+    def call() -> Any:
+        coro = func()
+        try:
+            coro.send(None)
+        except StopIteration as stop:
+            return stop.value
+        coro.close()
+        msg = "Expected the coroutine to finish without suspending"
+        raise RuntimeError(msg)
+
+    return call
+
+
+async def measure_all(count: int) -> list[tuple[str, tuple[int, int, float]]]:
+    with greeting_provider.scope(), recipient_provider.scope():
+        results = [
+            ("plain", measure(plain, count)),
+            ("sync missing", measure(sync_injected, count)),
+            ("async missing", measure(run_coroutine(async_injected), count)),
+        ]
+        async with injector.shared(Greeting, Recipient):
+            results.extend(
+                [
+                    ("sync shared", measure(sync_injected, count)),
+                    ("async shared", measure(run_coroutine(async_injected), count)),
+                ]
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000, help="calls to time")
+    args = parser.parse_args()
+    print(f"{'path':<15} {'peak B/call':>12} {'retained B':>11} {'us/call':>8}")
+    for label, (peak, retained, seconds) in asyncio.run(measure_all(args.count)):
+        print(f"{label:<15} {peak:>12,} {retained:>11,} {seconds * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Measure the latency the ASGI and WSGI middleware add to each request."""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import NewType
+
+from pybooster import injector
+from pybooster import provider
+from pybooster import required
+from pybooster.middleware import ASGIMiddleware
+from pybooster.middleware import WSGIMiddleware
+
+Path = NewType("Path", str)
+Greeting = NewType("Greeting", str)
+
+
+@provider.function
+def greeting_provider() -> Greeting:
+    return Greeting("Hello")
+
+
+def make_scopes(count: int) -> list[Any]:
+    # unrelated providers show whether the per-request cost grows with the number of scopes
+    scopes: list[Any] = [greeting_provider.scope()]
+    for i in range(count - 1):
+        cls = NewType(f"Filler{i}", int)
+        scopes.append(provider.function(lambda i=i: i, provides=cls).scope())
+    return scopes
+
+
+async def asgi_app(scope: Any, receive: Any, send: Any) -> None:
+    del scope, receive
+    await send({"type": "http.response.body", "body": b"Hello"})
+
+
+@injector.asyncfunction
+async def injected_asgi_app(
+    scope: Any, receive: Any, send: Any, *, greeting: Greeting = required, path: Path = required
+) -> None:
+    del scope, receive
+    await send({"type": "http.response.body", "body": f"{greeting}, {path}!".encode()})
+
+
+def wsgi_app(environ: Any, start_response: Any) -> Iterator[bytes]:
+    del environ
+    start_response("200 OK", [])
+    yield b"Hello"
+
+
+@injector.iterator
+def injected_wsgi_app(
+    environ: Any, start_response: Any, *, greeting: Greeting = required, path: Path = required
+) -> Iterator[bytes]:
+    del environ
+    start_response("200 OK", [])
+    yield f"{greeting}, {path}!".encode()
+
+
+async def time_asgi(app: Callable[..., Any], count: int) -> float:
+    scope = {"type": "http", "path": "/world"}
+    receive = asyncio.Queue().get
+
+    async def send(_message: Any) -> None:
+        return None
+
+    await app(scope, receive, send)  # start up lazily before timing
+    start = time.perf_counter()
+    for _ in range(count):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / count
+
+
+def time_wsgi(app: Callable[..., Any], count: int) -> float:
+    environ = {"PATH_INFO": "/world"}
+
+    def start_response(*_: Any) -> None:
+        return None
+
+    start = time.perf_counter()
+    for _ in range(count):
+        response = app(environ, start_response)
+        for _chunk in response:
+            pass
+        if (close := getattr(response, "close", None)) is not None:
+            close()
+    return (time.perf_counter() - start) / count
+
+
+async def run_asgi(count: int, scope_counts: list[int]) -> None:
+    bare = await time_asgi(asgi_app, count)
+    print(f"asgi bare app: {bare * 1e6:.2f} us/request")
+    for scope_count in scope_counts:
+        for label, app in [("bare", asgi_app), ("injected", injected_asgi_app)]:
+            middleware = ASGIMiddleware(
+                app,
+                scopes=make_scopes(scope_count),
+                values=lambda scope: {Path: Path(scope["path"])},
+            )
+            seconds = await time_asgi(middleware, count)
+            await middleware.shutdown()
+            report("asgi", label, scope_count, seconds, bare)
+
+
+def run_wsgi(count: int, scope_counts: list[int]) -> None:
+    bare = time_wsgi(wsgi_app, count)
+    print(f"wsgi bare app: {bare * 1e6:.2f} us/request")
+    for scope_count in scope_counts:
+        for label, app in [("bare", wsgi_app), ("injected", injected_wsgi_app)]:
+            middleware = WSGIMiddleware(
+                app,
+                scopes=make_scopes(scope_count),
+                values=lambda environ: {Path: Path(environ["PATH_INFO"])},
+            )
+            seconds = time_wsgi(middleware, count)
+            middleware.close()
+            report("wsgi", label, scope_count, seconds, bare)
+
+
+def report(kind: str, label: str, scope_count: int, seconds: float, bare: float) -> None:
+    print(
+        f"{kind} middleware + {label:<8} app, {scope_count:>4} scopes: "
+        f"{seconds * 1e6:>6.2f} us/request ({(seconds - bare) * 1e6:+.2f})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50_000, help="requests to time")
+    parser.add_argument("--scopes", type=int, nargs="+", default=[1, 100], help="numbers of scopes to compare")
+    args = parser.parse_args()
+    asyncio.run(run_asgi(args.count, args.scopes))
+    run_wsgi(args.count, args.scopes)
+
+
+if __name__ == "__main__":
+    main()
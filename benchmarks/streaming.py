@@ -0,0 +1,61 @@
+"""Measure the per-item overhead an injected async iterator adds to a stream."""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import NewType
+
+from pybooster import injector
+from pybooster import provider
+from pybooster import required
+
+Offset = NewType("Offset", int)
+
+
+@provider.function
+def offset_provider() -> Offset:
+    return Offset(1)
+
+
+async def plain_rows(count: int, offset: int = 1) -> AsyncIterator[int]:
+    for i in range(count):
+        yield i + offset
+
+
+@injector.asynciterator
+async def injected_rows(count: int, *, offset: Offset = required) -> AsyncIterator[int]:
+    for i in range(count):
+        yield i + offset
+
+
+async def consume(rows: AsyncIterator[int]) -> float:
+    start = time.perf_counter()
+    async for _ in rows:
+        pass
+    return time.perf_counter() - start
+
+
+async def run(count: int, repeat: int) -> None:
+    with offset_provider.scope():
+        plain = min([await consume(plain_rows(count)) for _ in range(repeat)])
+        # the provider is entered for each stream
+        entered = min([await consume(injected_rows(count)) for _ in range(repeat)])
+        # the value is shared so the stream is handed back as-is
+        with injector.shared(Offset):
+            shared = min([await consume(injected_rows(count)) for _ in range(repeat)])
+    print(f"plain:    {count / plain:>12,.0f} items/s")
+    for label, seconds in [("entered", entered), ("shared", shared)]:
+        print(f"{label + ':':<9} {count / seconds:>12,.0f} items/s ({(seconds - plain) / count * 1e9:+.1f} ns/item)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000, help="items per stream")
+    parser.add_argument("--repeat", type=int, default=5, help="streams to time (the fastest is reported)")
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from pybooster import diagnostics
 from pybooster import injector
 from pybooster import provider
 from pybooster.types import required
@@ -5,6 +6,7 @@ from pybooster.types import required
 __version__ = "0.0.1"
 
 __all__ = (
+    "diagnostics",
     "injector",
     "provider",
     "required",
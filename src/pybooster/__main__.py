@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from pybooster._private._graph import build_graph
+from pybooster._private._graph import format_graph
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the PyBooster command line interface."""
+    parser = ArgumentParser(prog="python -m pybooster")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    graph = commands.add_parser("graph", help="Export the dependency graph of the given modules.")
+    graph.add_argument("modules", nargs="+", help="Importable names of modules to analyze.")
+    graph.add_argument("-f", "--format", choices=("json", "dot"), default="json", help="The output format.")
+
+    args = parser.parse_args(argv)
+    modules = [import_module(name) for name in args.modules]
+    sys.stdout.write(format_graph(build_graph(modules), args.format) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
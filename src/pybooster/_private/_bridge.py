@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from contextlib import AbstractContextManager
+from contextvars import copy_context
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Generic
+from typing import TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+    from types import TracebackType
+
+    from pybooster.types import AsyncContextManagerCallable
+    from pybooster.types import ContextManagerCallable
+
+R = TypeVar("R")
+
+
+class LoopBridge:
+    """Runs async providers on a dedicated event loop thread on behalf of sync code.
+
+    Every value is entered and exited by a single task on the bridge's loop. Since the
+    loop outlives any one injection, async resources (e.g. connection pools) that are
+    shared while the bridge is open stay bound to the same loop across calls.
+    """
+
+    __slots__ = ("_loop", "_thread")
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._loop is not None:
+            msg = "Bridge has already been started."
+            raise RuntimeError(msg)
+        loop = self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        loop.call_soon(ready.set)
+        self._thread = thread = threading.Thread(target=loop.run_forever, name="pybooster-bridge", daemon=True)
+        thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        if (loop := self._loop) is None or (thread := self._thread) is None:
+            return
+        self._loop = self._thread = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+    def wrap(self, manager: AsyncContextManagerCallable[[], R]) -> ContextManagerCallable[[], R]:
+        """Turn an async context manager factory into a sync one that runs on the bridge."""
+        return lambda: _BridgedContext(self, manager)
+
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        """Schedule a callback on the bridge's loop."""
+        self._get_loop(blocking=False).call_soon_threadsafe(callback)
+
+    def submit(self, coro: Coroutine[Any, Any, None]) -> Future[None]:
+        """Run a coroutine as a task on the bridge's loop within the caller's context."""
+        try:
+            loop = self._get_loop(blocking=True)
+        except BaseException:
+            coro.close()
+            raise
+        done: Future[None] = Future()
+        loop.call_soon_threadsafe(copy_context().run, _start_task, loop, coro, done)
+        return done
+
+    def _get_loop(self, *, blocking: bool) -> asyncio.AbstractEventLoop:
+        if (loop := self._loop) is None:
+            msg = "Bridge is not running."
+            raise RuntimeError(msg)
+        if blocking and threading.current_thread() is self._thread:
+            msg = "Cannot block on a bridged provider from within the bridge's own event loop."
+            raise RuntimeError(msg)
+        return loop
+
+
+class _BridgedContext(AbstractContextManager[R], Generic[R]):
+    """Holds an async context open in a task on the bridge's loop until the sync context exits."""
+
+    __slots__ = ("_bridge", "_done", "_entered", "_error", "_manager", "_release")
+
+    def __init__(self, bridge: LoopBridge, manager: AsyncContextManagerCallable[[], R]) -> None:
+        self._bridge = bridge
+        self._manager = manager
+        self._entered: Future[R] = Future()
+        self._error: BaseException | None = None
+        self._release: asyncio.Event | None = None
+
+    def __enter__(self) -> R:
+        self._done = self._bridge.submit(self._hold())
+        return self._entered.result()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool:
+        self._error = exc_value
+        release = self._release
+        if release is None:  # nocov
+            msg = "Bridged context was not entered."
+            raise RuntimeError(msg)
+        self._bridge.call_soon(release.set)
+        try:
+            self._done.result()
+        except BaseException as error:
+            if error is exc_value:
+                return False
+            raise
+        # the async context suppressed the error (if there was one)
+        return exc_value is not None
+
+    async def _hold(self) -> None:
+        self._release = release = asyncio.Event()
+        try:
+            async with self._manager() as value:
+                self._entered.set_result(value)
+                await release.wait()
+                self._reraise()
+        except BaseException as error:
+            if not self._entered.done():
+                self._entered.set_exception(error)
+                return
+            raise
+
+    def _reraise(self) -> None:
+        # raise the sync context's error so the async context can handle it
+        if (error := self._error) is not None:
+            raise error
+
+
+def _start_task(loop: asyncio.AbstractEventLoop, coro: Coroutine[Any, Any, None], done: Future[None]) -> None:
+    # create_task copies the current context which is the caller's thanks to copy_context().run
+    task = loop.create_task(coro)
+    task.add_done_callback(lambda t: _copy_result(t, done))
+
+
+def _copy_result(task: asyncio.Task[None], done: Future[None]) -> None:
+    if task.cancelled():
+        done.cancel()
+    elif (error := task.exception()) is not None:
+        done.set_exception(error)
+    else:
+        done.set_result(None)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import AbstractAsyncContextManager
+from contextlib import AbstractContextManager
+from contextlib import AsyncExitStack
+from contextlib import ExitStack
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from pybooster._private._injector import async_enter_provider_context
+from pybooster._private._injector import sync_enter_provider_context
+from pybooster._private._provider import AsyncProviderInfo
+from pybooster._private._provider import SyncProviderInfo
+from pybooster._private._utils import undefined
+
+if TYPE_CHECKING:
+    from pybooster.types import AsyncContextManagerCallable
+    from pybooster.types import ContextManagerCallable
+
+R = TypeVar("R")
+
+
+class SyncScopeCache(Generic[R]):
+    """Lazily enters a provider's value once and reuses it until the scope that owns it exits."""
+
+    __slots__ = ("_closed", "_info", "_lock", "_stack", "_value")
+
+    def __init__(self, manager: ContextManagerCallable[[], R], name: str) -> None:
+        self._info = SyncProviderInfo(True, manager, None, name)
+        self._value: Any = undefined
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+
+    def manager(self) -> _SyncCachedContext[R]:
+        return _SyncCachedContext(self)
+
+    def get(self) -> R:
+        if (value := self._value) is undefined:
+            with self._lock:
+                if (value := self._value) is undefined:
+                    _check_not_closed(self._closed)
+                    value = self._value = sync_enter_provider_context(self._stack, self._info)
+        return value
+
+    def close(self, *exc: Any) -> None:
+        with self._lock:
+            self._closed = True
+            self._value = undefined
+        self._stack.__exit__(*exc)
+
+
+class AsyncScopeCache(Generic[R]):
+    """Like `SyncScopeCache` but for async providers (which must exit asynchronously)."""
+
+    __slots__ = ("_closed", "_info", "_lock", "_stack", "_value")
+
+    def __init__(self, manager: AsyncContextManagerCallable[[], R], name: str) -> None:
+        self._info = AsyncProviderInfo(False, manager, None, name)
+        self._value: Any = undefined
+        self._closed = False
+        self._lock = asyncio.Lock()
+        self._stack = AsyncExitStack()
+
+    def manager(self) -> _AsyncCachedContext[R]:
+        return _AsyncCachedContext(self)
+
+    async def get(self) -> R:
+        if (value := self._value) is undefined:
+            async with self._lock:
+                if (value := self._value) is undefined:
+                    _check_not_closed(self._closed)
+                    value = self._value = await async_enter_provider_context(self._stack, self._info)
+        return value
+
+    async def aclose(self, *exc: Any) -> None:
+        async with self._lock:
+            self._closed = True
+            self._value = undefined
+        await self._stack.__aexit__(*exc)
+
+
+class _SyncCachedContext(AbstractContextManager[R]):
+    """Provides the cached value without exiting it (the cache's owner does that)."""
+
+    __slots__ = ("_cache",)
+
+    def __init__(self, cache: SyncScopeCache[R]) -> None:
+        self._cache = cache
+
+    def __enter__(self) -> R:
+        return self._cache.get()
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+class _AsyncCachedContext(AbstractAsyncContextManager[R]):
+    """Provides the cached value without exiting it (the cache's owner does that)."""
+
+    __slots__ = ("_cache",)
+
+    def __init__(self, cache: AsyncScopeCache[R]) -> None:
+        self._cache = cache
+
+    async def __aenter__(self) -> R:
+        return await self._cache.get()
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
+def _check_not_closed(closed: bool) -> None:  # noqa: FBT001
+    if closed:
+        msg = "Cannot use a cached provider after its scope has exited."
+        raise RuntimeError(msg)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import weakref
+from contextlib import ExitStack
+from functools import wraps
+from inspect import Parameter
+from inspect import signature
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import TypeVar
+
+from pybooster._private._injector import setdefault_arguments_with_initialized_dependencies
+from pybooster._private._injector import sync_update_arguments_by_initializing_dependencies
+from pybooster._private._utils import mark_injected
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from collections.abc import Sequence
+
+    from pybooster._private._utils import NormDependencies
+
+T = TypeVar("T")
+
+
+def make_injected_class(cls: type[T], dependencies: NormDependencies, *, lazy: bool, slots: bool) -> type[T]:
+    if slots:
+        cls = _with_slots(cls, dependencies, lazy=lazy)
+    if lazy:
+        for name, types in dependencies.items():
+            descriptor = LazyDependency(name, types, storage=vars(cls).get(_storage_name(name)) if slots else None)
+            setattr(cls, name, descriptor)
+    # dependencies the class' own __init__ accepts (e.g. dataclass fields) are passed to it
+    init_params = _get_init_parameters(cls.__init__).intersection(dependencies)
+    if lazy and init_params:
+        msg = (
+            f"Lazy dependencies {sorted(init_params)} of {cls.__qualname__} cannot also be parameters of its __init__."
+        )
+        raise TypeError(msg)
+    cls.__init__ = _make_init(cls.__init__, dependencies, init_params, lazy=lazy)  # type: ignore[reportAttributeAccessIssue]
+    mark_injected(cls, dependencies, sync=True)
+    return cls
+
+
+class LazyDependency:
+    """A descriptor that injects a dependency the first time it is accessed."""
+
+    __slots__ = ("name", "storage", "types")
+
+    def __init__(self, name: str, types: Sequence[type], storage: Any = None) -> None:
+        self.name = name
+        self.types = types
+        self.storage = storage
+        """A slot to store the value in (otherwise it is kept in the instance's __dict__)."""
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        if (storage := self.storage) is not None:
+            try:
+                return storage.__get__(obj, objtype)
+            except AttributeError:
+                pass
+        values = _resolve_dependencies(obj, {self.name: self.types})
+        # another thread may have won the race to resolve this first
+        return self.set_default(obj, values[self.name])
+
+    def set_default(self, obj: Any, value: Any) -> Any:
+        if (storage := self.storage) is None:
+            return vars(obj).setdefault(self.name, value)
+        try:
+            return storage.__get__(obj, type(obj))
+        except AttributeError:
+            storage.__set__(obj, value)
+            return value
+
+
+def _make_init(
+    init: Callable[..., None],
+    dependencies: NormDependencies,
+    init_params: frozenset[str],
+    *,
+    lazy: bool,
+) -> Callable[..., None]:
+    @wraps(init)
+    def __init__(self: Any, *args: Any, **kwargs: Any) -> None:  # noqa: N807
+        values = {name: kwargs.pop(name) for name in dependencies if name in kwargs}
+        if lazy:
+            cls = type(self)
+            for name, value in values.items():
+                getattr(cls, name).set_default(self, value)
+        else:
+            values = _resolve_dependencies(self, dependencies, values)
+            for name, value in values.items():
+                if name in init_params:
+                    kwargs[name] = value
+                else:
+                    setattr(self, name, value)
+        # always call it so that unexpected arguments are rejected even by object.__init__
+        init(self, *args, **kwargs)
+
+    return __init__
+
+
+def _get_init_parameters(init: Callable[..., None]) -> frozenset[str]:
+    try:
+        params = signature(init).parameters.values()
+    except ValueError:  # nocov (some builtins have no signature)
+        return frozenset()
+    return frozenset(p.name for p in params if p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY))
+
+
+def _resolve_dependencies(obj: Any, dependencies: NormDependencies, values: dict[str, Any] | None = None) -> dict:
+    values = {} if values is None else values
+    if missing := setdefault_arguments_with_initialized_dependencies(values, dependencies):
+        stack = ExitStack()
+        try:
+            sync_update_arguments_by_initializing_dependencies(stack, values, missing)
+        except BaseException:
+            stack.close()
+            raise
+        # exit the providers once the object has been garbage collected
+        weakref.finalize(obj, stack.close)
+    return values
+
+
+def _with_slots(cls: type[T], dependencies: NormDependencies, *, lazy: bool) -> type[T]:
+    namespace = dict(vars(cls))
+    old_slots = namespace.get("__slots__", ())
+    old_slots = (old_slots,) if isinstance(old_slots, str) else tuple(old_slots)
+    # the slots' descriptors are recreated along with the class
+    for name in ("__dict__", "__weakref__", *old_slots, *dependencies):
+        namespace.pop(name, None)
+    new_slots = [_storage_name(name) for name in dependencies] if lazy else list(dependencies)
+    if not any(hasattr(base, "__weakref__") for base in cls.__bases__):
+        new_slots.append("__weakref__")  # needed to exit providers when instances are collected
+    namespace["__slots__"] = (*old_slots, *(name for name in new_slots if name not in old_slots))
+    new_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    new_cls.__qualname__ = cls.__qualname__
+    # point zero-argument super() calls at the new class
+    for attr in namespace.values():
+        func = getattr(attr, "__func__", attr)
+        if (closure := getattr(func, "__closure__", None)) and "__class__" in func.__code__.co_freevars:
+            cell = closure[func.__code__.co_freevars.index("__class__")]
+            if cell.cell_contents is cls:
+                cell.cell_contents = new_cls
+    return new_cls
+
+
+def _storage_name(name: str) -> str:
+    return f"_{name}_value"
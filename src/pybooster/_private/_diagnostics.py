@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from typing import TYPE_CHECKING
+from typing import Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class ValueRecord:
+    """Information about a value that was produced by a provider."""
+
+    __slots__ = ("__weakref__", "created", "exited", "name", "ref", "size")
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+        self.created = time.monotonic()
+        self.exited: float | None = None
+        self.ref: Callable[[], Any] | None = None
+
+
+class Tracker:
+    """Keeps track of the values produced by providers while diagnostics are enabled."""
+
+    def __init__(self, *, trace_memory: bool, started_tracing: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.started_tracing = started_tracing
+        self.created: dict[str, int] = {}
+        self.exited: dict[str, int] = {}
+        # records are removed once their value is garbage collected (or exited if that
+        # cannot be detected) so only values which may still be in memory are retained
+        self.records: dict[int, ValueRecord] = {}
+        self._lock = threading.Lock()
+
+    def get_traced_memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    def enter(self, name: str, value: Any, allocated: int) -> ValueRecord:
+        record = ValueRecord(name, max(sys.getsizeof(value), allocated))
+        key = id(record)
+        try:
+            record.ref = weakref.ref(value, lambda _: self.records.pop(key, None))
+        except TypeError:
+            record.ref = None
+        with self._lock:
+            self.created[name] = self.created.get(name, 0) + 1
+            self.records[key] = record
+        return record
+
+    def exit(self, record: ValueRecord) -> None:
+        record.exited = time.monotonic()
+        with self._lock:
+            self.exited[record.name] = self.exited.get(record.name, 0) + 1
+            if record.ref is None or record.ref() is None:
+                self.records.pop(id(record), None)
+
+
+TRACKER: Tracker | None = None
+"""The active tracker (if diagnostics are enabled)."""
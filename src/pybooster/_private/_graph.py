@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Literal
+from typing import TypedDict
+from typing import get_args
+from typing import get_origin
+
+from pybooster._private._utils import get_injected
+from pybooster.provider import AsyncProvider
+from pybooster.provider import SyncProvider
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from collections.abc import Sequence
+    from types import ModuleType
+
+    from pybooster._private._utils import NormDependencies
+    from pybooster.provider import Provider
+
+
+class GraphNode(TypedDict):
+    id: str
+    kind: Literal["provider", "injector"]
+    name: str
+    provides: str | None
+    sync: bool
+    teardown: bool
+    depth: int
+    fan_out: int
+
+
+class GraphEdge(TypedDict):
+    source: str
+    target: str
+    dependency: str
+    boundary: bool
+
+
+class Graph(TypedDict):
+    nodes: list[GraphNode]
+    edges: list[GraphEdge]
+
+
+def build_graph(modules: Sequence[ModuleType]) -> Graph:
+    # objects re-exported by other modules are keyed by identity so each is one node
+    found: dict[int, tuple[str, Any, bool]] = {}
+    for module in modules:
+        for name, obj in _iter_module_objects(module):
+            if isinstance(obj, (SyncProvider, AsyncProvider)) or get_injected(obj) is not None:
+                # prefer the name given by the module that defines the object
+                defined_here = _get_defining_module(obj) == module.__name__
+                if (prior := found.get(id(obj))) is None or (defined_here and not prior[2]):
+                    found[id(obj)] = (name, obj, defined_here)
+
+    providers: dict[str, Provider] = {}
+    injected: dict[str, tuple[NormDependencies, bool]] = {}
+    for name, obj, _ in found.values():
+        if isinstance(obj, (SyncProvider, AsyncProvider)):
+            providers[name] = obj
+        else:
+            injected[name] = get_injected(obj)  # type: ignore[reportArgumentType]
+
+    dependencies: dict[str, list[Sequence[type]]] = {}
+    nodes: dict[str, GraphNode] = {}
+    for node_id, prov in providers.items():
+        dependencies[node_id] = sorted(prov._dependency_set, key=_type_name)  # noqa: SLF001
+        nodes[node_id] = {
+            "id": node_id,
+            "kind": "provider",
+            "name": getattr(prov.value, "__qualname__", node_id),
+            "provides": _type_name(prov.provides),
+            "sync": prov._sync,  # noqa: SLF001
+            "teardown": prov.teardown,
+            "depth": 0,
+            "fan_out": len(prov._dependency_set),  # noqa: SLF001
+        }
+    for node_id, (deps, sync) in injected.items():
+        dependencies[node_id] = list(deps.values())
+        nodes[node_id] = {
+            "id": node_id,
+            "kind": "injector",
+            "name": node_id,
+            "provides": None,
+            "sync": sync,
+            "teardown": False,
+            "depth": 0,
+            "fan_out": len(deps),
+        }
+
+    edges: list[GraphEdge] = []
+    children: dict[str, list[str]] = {}
+    for source, deps in dependencies.items():
+        targets = children[source] = []
+        for types in deps:
+            for target, prov in providers.items():
+                if any(_satisfies(prov.provides, cls) for cls in types):
+                    targets.append(target)
+                    edges.append(
+                        {
+                            "source": source,
+                            "target": target,
+                            "dependency": " | ".join(map(_type_name, types)),
+                            "boundary": nodes[source]["sync"] != prov._sync,  # noqa: SLF001
+                        }
+                    )
+
+    depths: dict[str, int] = {}
+    for node_id, node in nodes.items():
+        node["depth"] = _get_depth(node_id, children, depths, set())
+
+    return {"nodes": list(nodes.values()), "edges": edges}
+
+
+def format_graph(graph: Graph, fmt: Literal["json", "dot"]) -> str:
+    if fmt == "json":
+        return json.dumps(graph, indent=2)
+
+    lines = ["digraph pybooster {"]
+    for node in graph["nodes"]:
+        label = node["name"] if node["provides"] is None else f"{node['name']} -> {node['provides']}"
+        attrs = {
+            "label": f"{label}\\ndepth={node['depth']} fan_out={node['fan_out']}",
+            "shape": "box" if node["kind"] == "provider" else "ellipse",
+            "style": "dashed" if not node["sync"] else "solid",
+            "peripheries": "2" if node["teardown"] else "1",
+        }
+        lines.append(f"  {_quote(node['id'])} [{_format_attrs(attrs)}];")
+    for edge in graph["edges"]:
+        attrs = {"label": edge["dependency"], "color": "red" if edge["boundary"] else "black"}
+        lines.append(f"  {_quote(edge['source'])} -> {_quote(edge['target'])} [{_format_attrs(attrs)}];")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _iter_module_objects(module: ModuleType) -> Iterator[tuple[str, Any]]:
+    for name, obj in vars(module).items():
+        qualname = f"{module.__name__}.{name}"
+        yield qualname, obj
+        if isinstance(obj, type) and obj.__module__ == module.__name__:
+            for attr_name, attr in vars(obj).items():
+                yield f"{qualname}.{attr_name}", (
+                    attr.__func__ if isinstance(attr, (classmethod, staticmethod)) else attr
+                )
+
+
+def _get_defining_module(obj: Any) -> str | None:
+    func = obj.value if isinstance(obj, (SyncProvider, AsyncProvider)) else obj
+    return getattr(func, "__module__", None)
+
+
+def _satisfies(provides: Any, cls: Any) -> bool:
+    if provides == cls:
+        return True
+    if get_origin(provides) is tuple:
+        return any(_satisfies(item, cls) for item in get_args(provides))
+    return isinstance(provides, type) and isinstance(cls, type) and issubclass(provides, cls)
+
+
+def _get_depth(node_id: str, children: dict[str, list[str]], depths: dict[str, int], visiting: set[str]) -> int:
+    if node_id in depths:
+        return depths[node_id]
+    if node_id in visiting:
+        return 0  # break cycles
+    visiting.add(node_id)
+    depth = max((1 + _get_depth(c, children, depths, visiting) for c in children.get(node_id, ())), default=0)
+    visiting.discard(node_id)
+    depths[node_id] = depth
+    return depth
+
+
+def _type_name(cls: Any) -> str:
+    if isinstance(cls, (list, tuple)):
+        return " | ".join(map(_type_name, cls))
+    if get_origin(cls) is not None:
+        return repr(cls)
+    return getattr(cls, "__qualname__", None) or repr(cls)
+
+
+def _format_attrs(attrs: dict[str, str]) -> str:
+    return ", ".join(f"{k}={_quote(v)}" for k, v in attrs.items())
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '\\"') + '"'
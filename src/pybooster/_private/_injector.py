@@ -1,18 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import threading
+from contextlib import AsyncExitStack
+from contextlib import ExitStack
 from contextlib import asynccontextmanager
 from contextlib import contextmanager
 from contextvars import ContextVar
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
+from typing import NamedTuple
 from typing import ParamSpec
 from typing import TypeVar
 
+from pybooster._private import _diagnostics
+from pybooster._private._limits import get_remaining
+from pybooster._private._limits import wait_for_provider
 from pybooster._private._provider import AsyncProviderInfo
+from pybooster._private._provider import ProviderInfo
+from pybooster._private._provider import ProviderRegistry
 from pybooster._private._provider import SyncProviderInfo
 from pybooster._private._provider import get_provider_info
+from pybooster._private._provider import get_provider_registry
 from pybooster._private._provider import iter_provider_infos
+from pybooster._private._provider import set_provider_registry
 from pybooster._private._utils import NormDependencies
 from pybooster._private._utils import undefined
 
@@ -21,8 +34,9 @@ if TYPE_CHECKING:
     from collections.abc import Iterator
     from collections.abc import Mapping
     from collections.abc import Sequence
-    from contextlib import AsyncExitStack
-    from contextlib import ExitStack
+
+    from pybooster._private._stack import AsyncStack
+    from pybooster._private._stack import SyncStack
 
 
 P = ParamSpec("P")
@@ -32,55 +46,109 @@ R = TypeVar("R")
 def setdefault_arguments_with_initialized_dependencies(
     arguments: dict[str, Any],
     dependencies: NormDependencies,
-) -> NormDependencies:
-    missing: dict[str, Sequence[type]] = {}
+) -> NormDependencies | None:
+    missing: dict[str, Sequence[type]] | None = None
     dependency_values = _SHARED_VALUES.get()
+    forked_shares = _FORKED_SHARES
     for name, types in dependencies.items():
         if name not in arguments:
             for cls in types:
                 if cls in dependency_values:
-                    arguments[name] = dependency_values[cls]
-                    break
+                    value = dependency_values[cls]
+                    if not forked_shares or (value := _get_forked_value(value)) is not undefined:
+                        arguments[name] = value
+                        break
             else:
+                # only allocate when something is actually missing
+                if missing is None:
+                    missing = {}
                 missing[name] = types
     return missing
 
 
+def get_shared_dependency(types: Sequence[type]) -> Any:
+    shared_values = _SHARED_VALUES.get()
+    for cls in types:
+        if cls in shared_values:
+            value = shared_values[cls]
+            return _get_forked_value(value) if _FORKED_SHARES else value
+    return undefined
+
+
 def sync_update_arguments_by_initializing_dependencies(
-    stack: ExitStack | AsyncExitStack,
+    stack: SyncStack,
     arguments: dict[str, Any],
     dependencies: NormDependencies,
 ) -> None:
-    shared_values = _SHARED_VALUES.get()
-    for name, cls, info in iter_provider_infos(dependencies, sync=True):
-        if cls not in shared_values:
-            arguments[name] = sync_enter_provider_context(stack, info)
-        else:
-            arguments[name] = shared_values[cls]
+    if _FORKED_SHARES:
+        dependencies = _sync_reinit_forked_shares(arguments, dependencies)
+    if slots := _SHARED_SLOTS.get():
+        dependencies = _acquire_slot_values(slots, stack, arguments, dependencies, sync=True)
+    for name, _, info in iter_provider_infos(dependencies, sync=True):
+        arguments[name] = sync_enter_provider_context(stack, info)
 
 
 async def async_update_arguments_by_initializing_dependencies(
-    stack: AsyncExitStack,
+    stack: AsyncStack,
     arguments: dict[str, Any],
     dependencies: NormDependencies,
+    deadline: float | None = None,
 ) -> None:
-    shared_values = _SHARED_VALUES.get()
-    for name, cls, info in iter_provider_infos(dependencies, sync=False):
-        if cls not in shared_values:
-            if info["sync"] is True:
-                arguments[name] = sync_enter_provider_context(stack, info)
-            else:
-                arguments[name] = await async_enter_provider_context(stack, info)
+    if _FORKED_SHARES:
+        dependencies = await _async_reinit_forked_shares(arguments, dependencies)
+    if slots := _SHARED_SLOTS.get():
+        dependencies = _acquire_slot_values(slots, stack, arguments, dependencies, sync=False)
+    for name, _, info in iter_provider_infos(dependencies, sync=False):
+        if deadline is not None:
+            remaining = get_remaining(deadline, info.name)
+            if info.sync is False:
+                arguments[name] = await wait_for_provider(
+                    async_enter_provider_context(stack, info), remaining, info.name
+                )
+                continue
+        if info.sync is True:
+            arguments[name] = sync_enter_provider_context(stack, info)
         else:
-            arguments[name] = shared_values[cls]
+            arguments[name] = await async_enter_provider_context(stack, info)
+
+
+def sync_enter_dependency(stack: SyncStack, types: Sequence[type]) -> Any:
+    if _FORKED_SHARES and (share := _find_forked_share(types)) is not None and share.info.sync is True:
+        return share.sync_reinit()
+    if (slots := _SHARED_SLOTS.get()) and (slot := _find_slot(slots, types)) is not None:
+        return slot.acquire(stack, sync=True)
+    return sync_enter_provider_context(stack, get_provider_info(types, sync=True))
+
 
+async def async_enter_dependency(stack: AsyncStack, types: Sequence[type]) -> Any:
+    if _FORKED_SHARES and (share := _find_forked_share(types)) is not None:
+        return await share.async_reinit()
+    if (slots := _SHARED_SLOTS.get()) and (slot := _find_slot(slots, types)) is not None:
+        return slot.acquire(stack, sync=False)
+    info = get_provider_info(types, sync=False)
+    if info.sync is True:
+        return sync_enter_provider_context(stack, info)
+    return await async_enter_provider_context(stack, info)
 
-def sync_enter_provider_context(stack: ExitStack | AsyncExitStack, provider_info: SyncProviderInfo) -> Any:
-    return provider_info["getter"](stack.enter_context(provider_info["manager"]()))
+
+def sync_enter_provider_context(stack: SyncStack, provider_info: SyncProviderInfo) -> Any:
+    if (tracker := _diagnostics.TRACKER) is not None and provider_info.tracked:
+        allocated = tracker.get_traced_memory()
+        value = stack.enter_context(provider_info.manager())
+        stack.callback(tracker.exit, tracker.enter(provider_info.name, value, tracker.get_traced_memory() - allocated))
+    else:
+        value = stack.enter_context(provider_info.manager())
+    return value if (getter := provider_info.getter) is None else getter(value)
 
 
-async def async_enter_provider_context(stack: AsyncExitStack, provider_info: AsyncProviderInfo) -> Any:
-    return provider_info["getter"](await stack.enter_async_context(provider_info["manager"]()))
+async def async_enter_provider_context(stack: AsyncStack, provider_info: AsyncProviderInfo) -> Any:
+    if (tracker := _diagnostics.TRACKER) is not None and provider_info.tracked:
+        allocated = tracker.get_traced_memory()
+        value = await stack.enter_async_context(provider_info.manager())
+        stack.callback(tracker.exit, tracker.enter(provider_info.name, value, tracker.get_traced_memory() - allocated))
+    else:
+        value = await stack.enter_async_context(provider_info.manager())
+    return value if (getter := provider_info.getter) is None else getter(value)
 
 
 @contextmanager
@@ -92,12 +160,17 @@ def sync_shared_context(types: Sequence[type[R]], value: R) -> Iterator[R]:
         finally:
             reset()
     else:
-        with get_provider_info(types, sync=True)["manager"]() as value:
+        with ExitStack() as stack:
+            info = get_provider_info(types, sync=True)
+            value = sync_enter_provider_context(stack, info)
             reset = _set_shared_value(types, value)
+            share = None if info.on_fork == "share" else _ForkSensitiveShare(info, value, stack)
             try:
                 yield value
             finally:
                 reset()
+                if share is not None:
+                    share.sync_release()
 
 
 @asynccontextmanager
@@ -109,12 +182,30 @@ async def async_shared_context(types: Sequence[type[R]], value: R) -> AsyncItera
         finally:
             reset()
     else:
-        async with get_provider_info(types, sync=False)["manager"]() as value:
+        async with AsyncExitStack() as async_stack:
+            info = get_provider_info(types, sync=False)
+            stack: ExitStack | AsyncExitStack
+            if info.sync is True:
+                # use a sync stack so a forked process is able to close the value right away
+                stack = async_stack.enter_context(ExitStack())
+                value = sync_enter_provider_context(stack, info)
+            else:
+                stack = async_stack
+                value = await async_enter_provider_context(stack, info)
             reset = _set_shared_value(types, value)
+            share = None if info.on_fork == "share" else _ForkSensitiveShare(info, value, stack)
             try:
                 yield value
             finally:
                 reset()
+                if share is not None:
+                    await share.async_release()
+
+
+def get_shared_value(cls: type) -> Any:
+    if (value := _SHARED_VALUES.get().get(cls, undefined)) is undefined:
+        return slot.value if (slot := _SHARED_SLOTS.get().get(cls)) is not None else undefined
+    return _get_forked_value(value) if _FORKED_SHARES else value
 
 
 def _set_shared_value(types: Sequence[type[R]], value: R) -> Callable[[], None]:
@@ -123,3 +214,358 @@ def _set_shared_value(types: Sequence[type[R]], value: R) -> Callable[[], None]:
 
 
 _SHARED_VALUES: ContextVar[Mapping[type, Any]] = ContextVar("SINGLETONS", default={})
+
+
+class SharedSlot:
+    """A shared value that can be swapped out while it is in use.
+
+    Each value is held by a generation. Injectors hold a reference to the generation that
+    was current when they were entered and release it on exit. Once a generation has been
+    replaced and its last user has released it, its context is exited.
+    """
+
+    __slots__ = ("_current", "_orphans", "_sync", "types")
+
+    def __init__(self, types: Sequence[type], *, sync: bool) -> None:
+        self.types = types
+        self._sync = sync
+        self._current: _Generation | None = None
+        self._orphans: list[AsyncExitStack] = []
+
+    @property
+    def value(self) -> Any:
+        """The current value of the slot."""
+        return self._get_current().value
+
+    @property
+    def generation(self) -> int:
+        """The number of times the slot's value has been set."""
+        return 0 if (current := self._current) is None else current.number
+
+    def acquire(self, stack: SyncStack, *, sync: bool) -> Any:
+        while True:
+            if (current := self._get_current()).acquire():
+                if sync:
+                    stack.callback(current.release)
+                else:
+                    stack.push_async_callback(current.arelease)  # type: ignore[reportAttributeAccessIssue]
+                return current.value
+
+    def swap(self, value: Any) -> None:
+        self._orphan(self._replace(value, None))
+
+    def reload(self) -> Any:
+        stack = ExitStack()
+        try:
+            value = sync_enter_provider_context(stack, get_provider_info(self.types, sync=True))
+        except BaseException:
+            stack.close()
+            raise
+        self._orphan(self._replace(value, stack))
+        return value
+
+    async def areload(self) -> Any:
+        if self._sync:
+            return self.reload()
+        stack = AsyncExitStack()
+        try:
+            info = get_provider_info(self.types, sync=False)
+            if info.sync is True:
+                value = sync_enter_provider_context(stack, info)
+            else:
+                value = await async_enter_provider_context(stack, info)
+        except BaseException:
+            await stack.aclose()
+            raise
+        self._orphan(self._replace(value, stack))
+        await self.close_orphans()
+        return value
+
+    def close(self) -> None:
+        if (current := self._current) is not None:
+            self._current = None
+            self._orphan(self._retire(current))
+
+    async def close_orphans(self) -> None:
+        while self._orphans:
+            await self._orphans.pop().aclose()
+
+    def _get_current(self) -> _Generation:
+        if (current := self._current) is None:
+            msg = f"Shared slot for {self.types} is not active"
+            raise RuntimeError(msg)
+        return current
+
+    def _replace(self, value: Any, stack: ExitStack | AsyncExitStack | None) -> AsyncExitStack | None:
+        new = _Generation(self, value, stack, self.generation + 1)
+        old, self._current = self._current, new
+        return None if old is None else self._retire(old)
+
+    def _retire(self, generation: _Generation) -> AsyncExitStack | None:
+        stack = generation.retire()
+        if isinstance(stack, ExitStack):
+            stack.close()
+            return None
+        return stack
+
+    def _orphan(self, stack: AsyncExitStack | None) -> None:
+        # async stacks cannot be closed from sync code so they are closed by the next async call
+        if stack is not None:
+            self._orphans.append(stack)
+
+
+class _Generation:
+    """A value held by a shared slot and a count of its current users."""
+
+    __slots__ = ("_holders", "_slot", "_stacks", "number", "retired", "value")
+
+    def __init__(self, slot: SharedSlot, value: Any, stack: ExitStack | AsyncExitStack | None, number: int) -> None:
+        self.value = value
+        self.number = number
+        self.retired = False
+        self._slot = slot
+        # list.append and list.pop are atomic so these act as lock-free counters
+        self._holders: list[None] = []
+        self._stacks = [] if stack is None else [stack]
+
+    def acquire(self) -> bool:
+        self._holders.append(None)
+        if self.retired:
+            # replaced before we got a hold of it - let the caller try the new generation
+            self.release()
+            return False
+        return True
+
+    def release(self) -> None:
+        self._holders.pop()
+        if self.retired and not self._holders:
+            self._close_sync()
+
+    async def arelease(self) -> None:
+        self._holders.pop()
+        if self.retired and not self._holders and (stack := self._pop_stack()) is not None:
+            if isinstance(stack, AsyncExitStack):
+                await stack.aclose()
+            else:
+                stack.close()
+
+    def retire(self) -> ExitStack | AsyncExitStack | None:
+        self.retired = True
+        return None if self._holders else self._pop_stack()
+
+    def _close_sync(self) -> None:
+        if isinstance(stack := self._pop_stack(), ExitStack):
+            stack.close()
+        else:
+            self._slot._orphan(stack)  # noqa: SLF001
+
+    def _pop_stack(self) -> ExitStack | AsyncExitStack | None:
+        try:
+            # only one caller can pop the stack so it is only closed once
+            return self._stacks.pop()
+        except IndexError:
+            return None
+
+
+def set_shared_slot(slot: SharedSlot) -> Callable[[], None]:
+    types = slot.types
+    values_token = _SHARED_VALUES.set({k: v for k, v in _SHARED_VALUES.get().items() if k not in types})
+    slots_token = _SHARED_SLOTS.set({**_SHARED_SLOTS.get(), **dict.fromkeys(types, slot)})
+
+    def reset() -> None:
+        _SHARED_SLOTS.reset(slots_token)
+        _SHARED_VALUES.reset(values_token)
+
+    return reset
+
+
+def _find_slot(slots: Mapping[type, SharedSlot], types: Sequence[type]) -> SharedSlot | None:
+    for cls in types:
+        if cls in slots:
+            return slots[cls]
+    return None
+
+
+def _acquire_slot_values(
+    slots: Mapping[type, SharedSlot],
+    stack: SyncStack,
+    arguments: dict[str, Any],
+    dependencies: NormDependencies,
+    *,
+    sync: bool,
+) -> NormDependencies:
+    remaining: dict[str, Sequence[type]] = {}
+    for name, types in dependencies.items():
+        if (slot := _find_slot(slots, types)) is not None:
+            arguments[name] = slot.acquire(stack, sync=sync)
+        else:
+            remaining[name] = types
+    return remaining
+
+
+_SHARED_SLOTS: ContextVar[Mapping[type, SharedSlot]] = ContextVar("SHARED_SLOTS", default={})
+
+
+class Environment(NamedTuple):
+    """A snapshot of the active providers and shared values."""
+
+    registry: ProviderRegistry
+    shared_values: Mapping[type, Any]
+    shared_slots: Mapping[type, SharedSlot]
+
+
+def get_environment() -> Environment:
+    return Environment(get_provider_registry(), _SHARED_VALUES.get(), _SHARED_SLOTS.get())
+
+
+def set_environment(env: Environment) -> Callable[[], None]:
+    reset_registry = set_provider_registry(env.registry)
+    values_token = _SHARED_VALUES.set(env.shared_values)
+    slots_token = _SHARED_SLOTS.set(env.shared_slots)
+
+    def reset() -> None:
+        _SHARED_SLOTS.reset(slots_token)
+        _SHARED_VALUES.reset(values_token)
+        reset_registry()
+
+    return reset
+
+
+def enter_environment(env: Environment) -> None:
+    # resets are kept in a context variable so that each task or thread unwinds its own
+    _ENVIRONMENT_RESETS.set((set_environment(env), _ENVIRONMENT_RESETS.get()))
+
+
+def exit_environment() -> None:
+    if (resets := _ENVIRONMENT_RESETS.get()) is None:
+        msg = "No captured environment has been entered."
+        raise RuntimeError(msg)
+    reset, parent = resets
+    _ENVIRONMENT_RESETS.set(parent)
+    reset()
+
+
+_ENVIRONMENT_RESETS: ContextVar[tuple[Callable[[], None], Any] | None] = ContextVar("ENVIRONMENT_RESETS", default=None)
+
+
+class _ForkSensitiveShare:
+    """Tracks a shared value whose provider asked to not be reused in forked processes."""
+
+    __slots__ = ("_async_lock", "_lock", "info", "parent_stack", "parent_value", "stack", "value")
+
+    def __init__(self, info: ProviderInfo, parent_value: Any, parent_stack: ExitStack | AsyncExitStack) -> None:
+        self.info = info
+        self.parent_value = parent_value
+        self.parent_stack = parent_stack
+        self.value: Any = undefined
+        self.stack: ExitStack | AsyncExitStack | None = None
+        self._lock: threading.Lock | None = None
+        self._async_lock: asyncio.Lock | None = None
+        _LIVE_SHARES[id(self)] = self
+
+    def after_fork(self) -> None:
+        # create the locks now, before any thread in the child could race to create them
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        if self.info.on_fork == "reinit":
+            # the value belongs to the parent so keep its exit callbacks from ever running here
+            _ABANDONED_STACKS.append(self.parent_stack.pop_all())
+        elif isinstance(self.parent_stack, ExitStack):
+            self.parent_stack.close()
+        # async stacks cannot be closed here so they are closed when the shared context exits
+        _FORKED_SHARES[id(self.parent_value)] = self
+
+    def sync_reinit(self) -> Any:
+        if (lock := self._lock) is None:  # nocov
+            msg = "Cannot re-initialize a shared value before forking."
+            raise RuntimeError(msg)
+        with lock:
+            if self.value is undefined:
+                stack = ExitStack()
+                self.value = sync_enter_provider_context(stack, self.info)  # type: ignore[reportArgumentType]
+                self.stack = stack
+        return self.value
+
+    async def async_reinit(self) -> Any:
+        if self.info.sync is True:
+            # sync providers are entered without awaiting so they share the thread lock with sync injectors
+            return self.sync_reinit()
+        if (lock := self._async_lock) is None:  # nocov
+            msg = "Cannot re-initialize a shared value before forking."
+            raise RuntimeError(msg)
+        async with lock:
+            if self.value is undefined:
+                stack = AsyncExitStack()
+                self.value = await async_enter_provider_context(stack, self.info)
+                self.stack = stack
+        return self.value
+
+    def sync_release(self) -> None:
+        self._forget()
+        if self.stack is not None:
+            self.stack.close()  # type: ignore[reportAttributeAccessIssue]
+
+    async def async_release(self) -> None:
+        self._forget()
+        if isinstance(self.stack, AsyncExitStack):
+            await self.stack.aclose()
+        elif self.stack is not None:
+            self.stack.close()
+
+    def _forget(self) -> None:
+        _LIVE_SHARES.pop(id(self), None)
+        if _FORKED_SHARES.get(id(self.parent_value)) is self:
+            del _FORKED_SHARES[id(self.parent_value)]
+
+
+def _get_forked_value(value: Any) -> Any:
+    if (share := _FORKED_SHARES.get(id(value))) is None or share.parent_value is not value:
+        return value
+    return share.value
+
+
+def _find_forked_share(types: Sequence[type]) -> _ForkSensitiveShare | None:
+    shared_values = _SHARED_VALUES.get()
+    for cls in types:
+        if cls in shared_values:
+            share = _FORKED_SHARES.get(id(value := shared_values[cls]))
+            if share is not None and share.parent_value is value and share.info.on_fork == "reinit":
+                return share
+            return None
+    return None
+
+
+def _sync_reinit_forked_shares(arguments: dict[str, Any], dependencies: NormDependencies) -> NormDependencies:
+    remaining: dict[str, Sequence[type]] = {}
+    for name, types in dependencies.items():
+        if (share := _find_forked_share(types)) is not None and share.info.sync is True:
+            arguments[name] = share.sync_reinit()
+        else:
+            remaining[name] = types
+    return remaining
+
+
+async def _async_reinit_forked_shares(arguments: dict[str, Any], dependencies: NormDependencies) -> NormDependencies:
+    remaining: dict[str, Sequence[type]] = {}
+    for name, types in dependencies.items():
+        if (share := _find_forked_share(types)) is not None:
+            arguments[name] = await share.async_reinit()
+        else:
+            remaining[name] = types
+    return remaining
+
+
+def _after_fork_in_child() -> None:
+    for share in list(_LIVE_SHARES.values()):
+        share.after_fork()
+
+
+if hasattr(os, "register_at_fork"):  # nocov (not available on Windows)
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+_LIVE_SHARES: dict[int, _ForkSensitiveShare] = {}
+"""Fork sensitive shares that are active in this process."""
+_FORKED_SHARES: dict[int, _ForkSensitiveShare] = {}
+"""Fork sensitive shares inherited from a parent process, keyed by the ID of the inherited value."""
+_ABANDONED_STACKS: list[ExitStack | AsyncExitStack] = []
+"""Exit stacks inherited from a parent process that must never be closed."""
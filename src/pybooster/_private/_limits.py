@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import NoReturn
+from typing import TypeVar
+from weakref import WeakKeyDictionary
+
+from pybooster.types import ProviderTimeoutError
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from collections.abc import Awaitable
+    from collections.abc import Iterator
+    from contextlib import AbstractAsyncContextManager
+    from contextlib import AbstractContextManager
+    from types import TracebackType
+
+R = TypeVar("R")
+
+
+if sys.version_info >= (3, 11):
+    timeout = asyncio.timeout
+else:  # nocov
+
+    class timeout:  # noqa: N801
+        """A minimal version of `asyncio.timeout` (added in Python 3.11) for Python 3.10.
+
+        Unlike `asyncio.wait_for` the awaited work stays in the current task (and its
+        context) since it is the current task that gets cancelled once time runs out.
+        """
+
+        __slots__ = ("_expired", "_handle", "_seconds")
+
+        def __init__(self, seconds: float | None) -> None:
+            self._seconds = seconds
+            self._expired = False
+            self._handle: asyncio.TimerHandle | None = None
+
+        def expired(self) -> bool:
+            return self._expired
+
+        async def __aenter__(self) -> timeout:
+            if (seconds := self._seconds) is not None and (task := asyncio.current_task()) is not None:
+                self._handle = asyncio.get_running_loop().call_later(seconds, self._expire, task)
+            return self
+
+        async def __aexit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+        ) -> None:
+            if (handle := self._handle) is not None:
+                handle.cancel()
+                self._handle = None
+            # only convert our own cancellation
+            if self._expired and exc_type is asyncio.CancelledError:
+                raise asyncio.TimeoutError from exc_value
+
+        def _expire(self, task: asyncio.Task[Any]) -> None:
+            self._expired = True
+            task.cancel()
+
+
+async def wait_for(awaitable: Awaitable[R], seconds: float | None) -> R:
+    # unlike asyncio.wait_for this stays in the current task (and its context)
+    async with timeout(seconds):
+        return await awaitable
+
+
+async def wait_for_provider(awaitable: Awaitable[R], seconds: float, name: str) -> R:
+    cm = timeout(seconds)
+    try:
+        async with cm:
+            return await awaitable
+    except asyncio.TimeoutError:  # the same as the builtin TimeoutError since Python 3.11
+        # only report our own timeout - the provider may have raised a TimeoutError itself
+        if not cm.expired():
+            raise
+    _raise_provider_timeout(seconds, name)
+
+
+def get_deadline(timeout: float | None) -> float | None:
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def get_remaining(deadline: float, name: str) -> float:
+    if (remaining := deadline - time.monotonic()) <= 0:
+        msg = f"Deadline exceeded before entering provider {name}"
+        raise ProviderTimeoutError(msg)
+    return remaining
+
+
+def _raise_provider_timeout(seconds: float, name: str) -> NoReturn:
+    msg = f"Timed out after {seconds:.3g}s entering provider {name}"
+    raise ProviderTimeoutError(msg) from None
+
+
+@asynccontextmanager
+async def async_timeout(manager: AbstractAsyncContextManager[R], seconds: float, name: str) -> AsyncIterator[R]:
+    """Cancel the given context if it takes longer than the given number of seconds to enter."""
+    value = await wait_for_provider(manager.__aenter__(), seconds, name)
+    try:
+        yield value
+    except BaseException as exc:
+        if not await manager.__aexit__(type(exc), exc, exc.__traceback__):
+            raise
+    else:
+        await manager.__aexit__(None, None, None)
+
+
+class ConcurrencyLimiter:
+    """Limits how many values a provider may have entered at once.
+
+    A slot is held for as long as the provider's value is in use. Sync providers share a
+    single thread semaphore while async providers get one semaphore per event loop. Since
+    waiting for a thread semaphore would block the event loop (and with it whatever holds
+    the slot) sync providers refuse to wait when entered from a running event loop.
+    """
+
+    __slots__ = (
+        "_async_semaphores",
+        "_lock",
+        "_sync_semaphore",
+        "acquired",
+        "active",
+        "limit",
+        "max_waiting",
+        "name",
+        "timeout",
+        "timeouts",
+        "waiting",
+    )
+
+    def __init__(self, name: str, limit: int, timeout: float | None = None) -> None:
+        if limit < 1:
+            msg = f"Expected max_concurrent to be at least 1, got {limit}."
+            raise ValueError(msg)
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        """The number of values currently entered."""
+        self.waiting = 0
+        """The number of callers currently waiting for a slot."""
+        self.max_waiting = 0
+        """The largest number of callers that have waited for a slot at once."""
+        self.acquired = 0
+        """The total number of slots that have been acquired."""
+        self.timeouts = 0
+        """The total number of callers that gave up waiting for a slot."""
+        self._lock = threading.Lock()
+        self._sync_semaphore = threading.BoundedSemaphore(limit)
+        self._async_semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
+
+    @contextmanager
+    def sync_limit(self, manager: AbstractContextManager[R]) -> Iterator[R]:
+        """Hold a slot while the given context is entered."""
+        semaphore = self._sync_semaphore
+        if not semaphore.acquire(blocking=False):
+            self._check_no_running_loop()
+            self._wait_start()
+            acquired = False
+            try:
+                acquired = semaphore.acquire(timeout=self.timeout)
+            finally:
+                self._wait_stop(acquired=acquired)
+            if not acquired:
+                self._raise_timeout()
+        self._enter()
+        try:
+            with manager as value:
+                yield value
+        finally:
+            self._exit()
+            semaphore.release()
+
+    @asynccontextmanager
+    async def async_limit(self, manager: AbstractAsyncContextManager[R]) -> AsyncIterator[R]:
+        """Hold a slot while the given async context is entered."""
+        semaphore = self._get_async_semaphore()
+        if semaphore.locked():
+            self._wait_start()
+            acquired = False
+            try:
+                await wait_for(semaphore.acquire(), self.timeout)
+                acquired = True
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._wait_stop(acquired=acquired)
+            if not acquired:
+                self._raise_timeout()
+        else:
+            await semaphore.acquire()
+        self._enter()
+        try:
+            async with manager as value:
+                yield value
+        finally:
+            self._exit()
+            semaphore.release()
+
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if (semaphore := self._async_semaphores.get(loop)) is None:
+            semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    def _wait_start(self) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def _wait_stop(self, *, acquired: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.timeouts += 1
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.active += 1
+            self.acquired += 1
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.active -= 1
+
+    def _check_no_running_loop(self) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        msg = (
+            f"All {self.limit} slots of sync provider {self.name} are in use and waiting for one would "
+            "block the running event loop. Use an async provider to limit concurrency in async code."
+        )
+        raise RuntimeError(msg)
+
+    def _raise_timeout(self) -> None:
+        msg = f"Timed out after {self.timeout}s waiting for one of {self.limit} slots of provider {self.name}"
+        raise ProviderTimeoutError(msg)
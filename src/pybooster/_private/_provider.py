@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 from contextvars import ContextVar
+from operator import itemgetter
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
 from typing import Literal
+from typing import NamedTuple
 from typing import NoReturn
 from typing import ParamSpec
-from typing import TypedDict
 from typing import TypeVar
 from typing import Union
 from typing import cast
@@ -20,13 +21,16 @@ from pybooster.types import ProviderMissingError
 
 if TYPE_CHECKING:
     from collections.abc import Collection
+    from collections.abc import Iterable
     from collections.abc import Iterator
     from collections.abc import Mapping
     from collections.abc import Sequence
 
+    from pybooster._private._bridge import LoopBridge
     from pybooster._private._utils import NormDependencies
     from pybooster.types import AsyncContextManagerCallable
     from pybooster.types import ContextManagerCallable
+    from pybooster.types import ForkBehavior
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -50,14 +54,11 @@ def iter_provider_infos(dependencies: NormDependencies, *, sync: bool) -> Iterat
 
 
 def iter_provider_infos(dependencies: NormDependencies, *, sync: bool) -> Iterator[tuple[str, type, ProviderInfo]]:
-    provider_infos = get_all_provider_infos(sync=sync)
+    registry = _PROVIDER_REGISTRY.get()
     for name, types in dependencies.items():
-        for cls in types:
-            if (info := provider_infos.get(cls)) is not None:
-                break
-        else:
+        if (found := registry.lookup(types, sync=sync)) is None:
             raise_missing_provider(types, sync=sync)
-        yield name, cls, info
+        yield name, *found
 
 
 @overload
@@ -65,19 +66,59 @@ def get_provider_info(types: Sequence[type], *, sync: Literal[True]) -> SyncProv
 
 
 @overload
-def get_provider_info(types: Sequence[type], *, sync: Literal[False]) -> AsyncProviderInfo: ...
+def get_provider_info(types: Sequence[type], *, sync: Literal[False]) -> ProviderInfo: ...
 
 
 def get_provider_info(types: Sequence[type], *, sync: bool) -> ProviderInfo:
-    provider_infos = get_all_provider_infos(sync=sync)
-    for cls in types:
-        if (info := provider_infos.get(cls)) is not None:
-            return info
-    raise_missing_provider(types, sync=sync)
+    if (found := _PROVIDER_REGISTRY.get().lookup(types, sync=sync)) is None:
+        raise_missing_provider(types, sync=sync)
+    return found[1]
+
+
+def get_provider_registry() -> ProviderRegistry:
+    return _PROVIDER_REGISTRY.get()
+
+
+def set_provider_registry(registry: ProviderRegistry) -> Callable[[], None]:
+    token = _PROVIDER_REGISTRY.set(registry)
+    return lambda: _PROVIDER_REGISTRY.reset(token)
+
+
+def set_provider_bridge(bridge: LoopBridge | None) -> Callable[[], None]:
+    return set_provider_registry(_with_bridge(_PROVIDER_REGISTRY.get(), bridge))
+
+
+def _with_bridge(registry: ProviderRegistry, bridge: LoopBridge | None) -> ProviderRegistry:
+    parent = None if registry.parent is None else _with_bridge(registry.parent, bridge)
+    return ProviderRegistry(registry.sync_infos, registry.async_infos, bridge, parent)
+
+
+class ProviderOverride(NamedTuple):
+    provides: Any
+    manager: ContextManagerCallable[[], Any] | AsyncContextManagerCallable[[], Any]
+    dependency_set: set[Sequence[type]]
+    sync: bool
+    name: str
+    on_fork: ForkBehavior = "share"
+
+
+def set_provider_overrides(overrides: Sequence[ProviderOverride]) -> Callable[[], None]:
+    """Layer the given providers on top of the active ones without copying them."""
+    sync_infos: dict[type, SyncProviderInfo] = {}
+    async_infos: dict[type, AsyncProviderInfo] = {}
+    for o in overrides:
+        make_infos = _make_tuple_provider_infos if get_origin(o.provides) is tuple else _make_scalar_provider_infos
+        infos = make_infos(o.provides, o.manager, sync=o.sync, name=o.name, on_fork=o.on_fork)
+        (sync_infos if o.sync else async_infos).update(infos)  # type: ignore[reportArgumentType]
 
+    prior_registry = _PROVIDER_REGISTRY.get()
+    next_registry = ProviderRegistry(sync_infos, async_infos, prior_registry.bridge, prior_registry)
+    # overrides may depend on one another so check them against the new registry
+    for o in overrides:
+        _check_missing_dependencies(o.dependency_set, sync=o.sync, registry=next_registry)
 
-def get_all_provider_infos(*, sync: bool) -> Mapping[type, ProviderInfo]:
-    return _SYNC_PROVIDER_INFOS.get() if sync else {**_SYNC_PROVIDER_INFOS.get(), **_ASYNC_PROVIDER_INFOS.get()}
+    token = _PROVIDER_REGISTRY.set(next_registry)
+    return lambda: _PROVIDER_REGISTRY.reset(token)
 
 
 def set_provider(
@@ -86,48 +127,182 @@ def set_provider(
     dependency_set: set[Sequence[type]],
     *,
     sync: bool,
+    name: str,
+    on_fork: ForkBehavior = "share",
+    tracked: bool = True,
 ) -> Callable[[], None]:
     _check_missing_dependencies(dependency_set, sync=sync)
 
-    provider_infos_var = _SYNC_PROVIDER_INFOS if sync else _ASYNC_PROVIDER_INFOS
-    prior_provider_infos = provider_infos_var.get()
+    make_infos = _make_tuple_provider_infos if get_origin(provides) is tuple else _make_scalar_provider_infos
+    new_provider_infos = make_infos(provides, manager, sync=sync, name=name, on_fork=on_fork, tracked=tracked)
 
-    if get_origin(provides) is tuple:
-        new_provider_infos = _make_tuple_provider_infos(provides, manager, sync=sync)
-    else:
-        new_provider_infos = _make_scalar_provider_infos(provides, manager, sync=sync)
-
-    next_provider_infos = dict(prior_provider_infos)
+    prior_registry = _PROVIDER_REGISTRY.get()
+    next_provider_infos = dict(prior_registry.sync_infos if sync else prior_registry.async_infos)
     for cls, provider_info in new_provider_infos.items():
-        if isinstance(cls, type):
-            mro_without_builtins = filter(lambda c: c.__module__ != "builtins", cls.mro())
-            next_provider_infos.update(dict.fromkeys(mro_without_builtins, provider_info))
+        # re-insert so the most recently provided type is found first when resolving subclasses
+        next_provider_infos.pop(cls, None)
+        next_provider_infos[cls] = provider_info
+
+    # only the innermost layer is copied when overrides are active
+    bridge, parent = prior_registry.bridge, prior_registry.parent
+    extends = (prior_registry, new_provider_infos.keys())
+    if sync:
+        next_registry = ProviderRegistry(next_provider_infos, prior_registry.async_infos, bridge, parent, extends)  # type: ignore[reportArgumentType]
+    else:
+        next_registry = ProviderRegistry(prior_registry.sync_infos, next_provider_infos, bridge, parent, extends)  # type: ignore[reportArgumentType]
+
+    token = _PROVIDER_REGISTRY.set(next_registry)
+    return lambda: _PROVIDER_REGISTRY.reset(token)
+
+
+class ProviderRegistry:
+    """An immutable snapshot of the active providers.
+
+    Requested types are resolved to a provider lazily (accounting for subclasses) and the
+    result, including a miss, is cached for the lifetime of the snapshot. If a bridge is
+    given, sync lookups fall back to async providers run on its loop.
+
+    A registry that extends another (by adding a few providers to it) defers types its new
+    providers cannot satisfy to the registry it extends. Results are cached by both so a
+    short lived scope benefits from, and contributes to, the cache of the longer lived one.
+
+    A registry with a parent is an overlay whose providers take precedence over its
+    parent's. Types its own providers cannot satisfy are looked up in (and cached by) the
+    parent so overriding a few providers does not copy or invalidate the rest.
+    """
+
+    __slots__ = ("_affected", "_base", "_cache", "async_infos", "bridge", "parent", "sync_infos")
+
+    def __init__(
+        self,
+        sync_infos: Mapping[type, SyncProviderInfo],
+        async_infos: Mapping[type, AsyncProviderInfo],
+        bridge: LoopBridge | None = None,
+        parent: ProviderRegistry | None = None,
+        extends: tuple[ProviderRegistry, Iterable[Any]] | None = None,
+    ) -> None:
+        self.sync_infos = sync_infos
+        self.async_infos = async_infos
+        self.bridge = bridge
+        self.parent = parent
+        self._cache: dict[tuple[type, bool], tuple[type, ProviderInfo] | None] = {}
+        if extends is None:
+            self._base = None
+            self._affected: frozenset[Any] = frozenset()
         else:
-            next_provider_infos[cls] = provider_info
+            self._base, provided = extends
+            # the classes whose resolution the new providers may change
+            self._affected = frozenset(
+                affected for cls in provided for affected in (cls.__mro__ if isinstance(cls, type) else (cls,))
+            )
+
+    def lookup(self, types: Sequence[type], *, sync: bool) -> tuple[type, ProviderInfo] | None:
+        """Find the first of the given types that has a provider."""
+        cache = self._cache
+        for cls in types:
+            try:
+                found = cache[cls, sync]
+            except KeyError:
+                found = self._lookup_uncached(cls, sync=sync)
+            if found is not None:
+                return found
+        return None
+
+    def _lookup_uncached(self, cls: type, *, sync: bool) -> tuple[type, ProviderInfo] | None:
+        key = (cls, sync)
+        # find the oldest registry that resolves the type the same way as this one
+        misses = [self]
+        registry = self
+        found: Any = _MISSING
+        while (base := registry._base) is not None and cls not in registry._affected:  # noqa: SLF001
+            registry = base
+            if (found := registry._cache.get(key, _MISSING)) is not _MISSING:  # noqa: SLF001
+                break
+            misses.append(registry)
+        if found is _MISSING:
+            if (info := registry._resolve(cls, sync=sync)) is not None:  # noqa: SLF001
+                found = (cls, info)
+            elif (parent := registry.parent) is not None:
+                found = parent.lookup((cls,), sync=sync)
+            else:
+                found = None
+        for registry in misses:
+            registry._cache[key] = found  # noqa: SLF001
+        return found
+
+    def _resolve(self, cls: type, *, sync: bool) -> ProviderInfo | None:
+        if not sync and (info := _resolve_provider_info(self.async_infos, cls)) is not None:
+            return info
+        if (info := _resolve_provider_info(self.sync_infos, cls)) is not None or (bridge := self.bridge) is None:
+            return info
+        if (async_info := _resolve_provider_info(self.async_infos, cls)) is None:
+            return None
+        return SyncProviderInfo(
+            True,
+            bridge.wrap(async_info.manager),
+            async_info.getter,
+            async_info.name,
+            async_info.on_fork,
+            async_info.tracked,
+        )
+
+
+def _resolve_provider_info(provider_infos: Mapping[type, ProviderInfo], cls: type) -> ProviderInfo | None:
+    if not isinstance(cls, type) or _is_protocol(cls):
+        # only exact matches for new types, generic aliases, and (non-nominal) protocols
+        return provider_infos.get(cls)
+    for provided, info in reversed(provider_infos.items()):
+        # check the MRO rather than issubclass() so it's known what types a provider affects
+        if provided is cls or (isinstance(provided, type) and cls in provided.__mro__):
+            return info
+    return None
+
+
+_MISSING: Any = object()
 
-    token = provider_infos_var.set(next_provider_infos)  # type: ignore[reportArgumentType]
-    return lambda: provider_infos_var.reset(token)  # type: ignore[reportArgumentType]
 
+def _is_protocol(cls: type) -> bool:
+    return getattr(cls, "_is_protocol", False)
 
-def _check_missing_dependencies(dependency_set: set[Sequence[type]], *, sync: bool) -> None:
-    provider_infos = get_all_provider_infos(sync=sync)
+
+def _check_missing_dependencies(
+    dependency_set: set[Sequence[type]],
+    *,
+    sync: bool,
+    registry: ProviderRegistry | None = None,
+) -> None:
+    registry = registry or _PROVIDER_REGISTRY.get()
     missing: set[type] = set()
     for types in dependency_set:
-        missing.update(set(types) - provider_infos.keys())
+        missing.update(cls for cls in types if registry.lookup((cls,), sync=sync) is None)
     if missing:
         raise_missing_provider(missing, sync=sync)
 
 
-class SyncProviderInfo(TypedDict):
+class SyncProviderInfo(NamedTuple):
     sync: Literal[True]
     manager: ContextManagerCallable[[], Any]
-    getter: Callable[[Any], Any]
+    getter: Callable[[Any], Any] | None
+    """Extracts the dependency from the manager's value (None if it is the value itself)."""
+    name: str
+    """The name of the provider used in error messages."""
+    on_fork: ForkBehavior = "share"
+    """What forked processes do with a value that was shared before forking."""
+    tracked: bool = True
+    """Whether diagnostics record each value (False if the manager's owner records them)."""
 
 
-class AsyncProviderInfo(TypedDict):
+class AsyncProviderInfo(NamedTuple):
     sync: Literal[False]
     manager: AsyncContextManagerCallable[[], Any]
-    getter: Callable[[Any], Any]
+    getter: Callable[[Any], Any] | None
+    """Extracts the dependency from the manager's value (None if it is the value itself)."""
+    name: str
+    """The name of the provider used in error messages."""
+    on_fork: ForkBehavior = "share"
+    """What forked processes do with a value that was shared before forking."""
+    tracked: bool = True
+    """Whether diagnostics record each value (False if the manager's owner records them)."""
 
 
 ProviderInfo = SyncProviderInfo | AsyncProviderInfo
@@ -138,15 +313,21 @@ def _make_tuple_provider_infos(
     manager: ContextManagerCallable[[], Any] | AsyncContextManagerCallable[[], Any],
     *,
     sync: bool,
+    name: str,
+    on_fork: ForkBehavior,
+    tracked: bool = True,
 ) -> dict[type, ProviderInfo]:
     infos_list = (
-        _make_scalar_provider_infos(provides, manager, sync=sync),
+        _make_scalar_provider_infos(provides, manager, sync=sync, name=name, on_fork=on_fork, tracked=tracked),
         *(
             _make_scalar_provider_infos(
                 item_type,
                 manager,
                 sync=sync,
-                getter=lambda x, i=index: x[i],  # type: ignore[reportIndexIssue]
+                name=name,
+                on_fork=on_fork,
+                tracked=tracked,
+                getter=itemgetter(index),
             )
             for index, item_type in enumerate(get_args(provides))
         ),
@@ -159,13 +340,16 @@ def _make_scalar_provider_infos(
     manager: ContextManagerCallable[[], Any] | AsyncContextManagerCallable[[], Any],
     *,
     sync: bool,
-    getter: Callable[[R], Any] = lambda x: x,
+    name: str,
+    on_fork: ForkBehavior,
+    tracked: bool = True,
+    getter: Callable[[Any], Any] | None = None,
 ) -> dict[type, ProviderInfo]:
     if get_origin(provides) is Union:
         msg = f"Cannot provide a union type {provides}."
         raise TypeError(msg)
-    return {provides: cast(ProviderInfo, {"manager": manager, "getter": getter, "sync": sync})}
+    info_type = SyncProviderInfo if sync else AsyncProviderInfo
+    return {provides: cast(ProviderInfo, info_type(sync, manager, getter, name, on_fork, tracked))}  # type: ignore[reportArgumentType]
 
 
-_SYNC_PROVIDER_INFOS: ContextVar[Mapping[type, SyncProviderInfo]] = ContextVar("SYNC_PROVIDER_INFOS", default={})
-_ASYNC_PROVIDER_INFOS: ContextVar[Mapping[type, AsyncProviderInfo]] = ContextVar("ASYNC_PROVIDER_INFOS", default={})
+_PROVIDER_REGISTRY: ContextVar[ProviderRegistry] = ContextVar("PROVIDER_REGISTRY", default=ProviderRegistry({}, {}))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+import tempfile
+from contextlib import suppress
+from typing import Any
+from typing import NamedTuple
+
+# prefer a RAM backed file system so segments never touch the disk
+_SEGMENT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None  # noqa: PTH112, S108
+
+
+class Segment(NamedTuple):
+    """Describes a memory mapped file holding the bytes of a provider's value."""
+
+    path: str | None
+    """The file holding the value (None if the value is empty)."""
+    size: int
+    """The number of bytes in the value."""
+    dtype: str | None
+    """The NumPy data type of the value (None if it is not an array)."""
+    shape: tuple[int, ...]
+    """The shape of the value if it is an array."""
+
+
+def write_segment(value: Any) -> Segment:
+    buffer, dtype, shape = _get_buffer(value)
+    if not buffer.nbytes:
+        return Segment(None, 0, dtype, shape)
+    fd, path = tempfile.mkstemp(prefix="pybooster-", dir=_SEGMENT_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(buffer)
+    except BaseException:
+        os.unlink(path)  # noqa: PTH108
+        raise
+    return Segment(path, buffer.nbytes, dtype, shape)
+
+
+def delete_segment(segment: Segment) -> None:
+    if segment.path is not None:
+        with suppress(FileNotFoundError):
+            os.unlink(segment.path)  # noqa: PTH108
+
+
+def map_segment(segment: Segment) -> tuple[mmap.mmap | None, Any]:
+    """Map the segment into memory and return a read-only view of it."""
+    if segment.path is None:
+        mapped = None
+        buffer: Any = memoryview(b"")
+    else:
+        with open(segment.path, "rb") as f:  # noqa: PTH123
+            mapped = buffer = mmap.mmap(f.fileno(), segment.size, access=mmap.ACCESS_READ)
+    if segment.dtype is None:
+        return mapped, memoryview(buffer)
+    import numpy as np  # the value was an array so numpy must be installed
+
+    return mapped, np.frombuffer(buffer, dtype=segment.dtype).reshape(segment.shape)
+
+
+def unmap_segment(mapped: mmap.mmap | None) -> None:
+    if mapped is not None:
+        # if views are still referenced the mapping is released once they are collected
+        with suppress(BufferError):
+            mapped.close()
+
+
+def _get_buffer(value: Any) -> tuple[memoryview, str | None, tuple[int, ...]]:
+    # check for arrays without importing numpy since it is an optional dependency
+    if (np := sys.modules.get("numpy")) is not None and isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            msg = f"Cannot put an array with dtype {value.dtype} in shared memory."
+            raise TypeError(msg)
+        array = np.ascontiguousarray(value)
+        return memoryview(array.reshape(-1).view(np.uint8)), array.dtype.str, array.shape
+    try:
+        view = memoryview(value)
+    except TypeError:
+        msg = f"Expected a bytes-like object or NumPy array to put in shared memory, got {type(value)}."
+        raise TypeError(msg) from None
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes())
+    return view.cast("B"), None, ()
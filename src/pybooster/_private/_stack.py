@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import TypeAlias
+from typing import TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Callable
+    from contextlib import AbstractAsyncContextManager
+    from contextlib import AbstractContextManager
+    from contextlib import AsyncExitStack
+    from contextlib import ExitStack
+
+R = TypeVar("R")
+
+
+class CallbackStack:
+    """A lightweight stand-in for `ExitStack` used when injecting dependencies.
+
+    Exit methods are stored as-is rather than being wrapped in a closure and nothing
+    is allocated to handle exceptions unless one is raised.
+    """
+
+    __slots__ = ("_exits",)
+
+    def __init__(self) -> None:
+        self._exits: list[Callable[..., Any]] = []
+
+    def enter_context(self, manager: AbstractContextManager[R]) -> R:
+        value = type(manager).__enter__(manager)
+        self._exits.append(manager.__exit__)
+        return value
+
+    def callback(self, func: Callable[..., Any], /, *args: Any) -> None:
+        self._exits.append(lambda *_: func(*args))
+
+    def close(self) -> None:
+        self.__exit__(None, None, None)
+
+    def __enter__(self) -> CallbackStack:
+        return self
+
+    def __exit__(self, *exc_details: Any) -> bool:
+        received_exc = exc_details[0] is not None
+        frame_exc = sys.exc_info()[1]
+        suppressed_exc = False
+        pending_raise = False
+        exits = self._exits
+        while exits:
+            try:
+                if exits.pop()(*exc_details):
+                    suppressed_exc = True
+                    pending_raise = False
+                    exc_details = (None, None, None)
+            except BaseException:  # noqa: BLE001, PERF203
+                new_exc_details = sys.exc_info()
+                _fix_exception_context(new_exc_details[1], exc_details[1], frame_exc)
+                pending_raise = True
+                exc_details = new_exc_details
+        if pending_raise:
+            _reraise(exc_details[1])
+        return received_exc and suppressed_exc
+
+
+class AsyncCallbackStack:
+    """A lightweight stand-in for `AsyncExitStack` used when injecting dependencies."""
+
+    __slots__ = ("_exits", "_is_sync")
+
+    def __init__(self) -> None:
+        self._exits: list[Callable[..., Any]] = []
+        self._is_sync: list[bool] = []
+
+    def enter_context(self, manager: AbstractContextManager[R]) -> R:
+        value = type(manager).__enter__(manager)
+        self._exits.append(manager.__exit__)
+        self._is_sync.append(True)
+        return value
+
+    async def enter_async_context(self, manager: AbstractAsyncContextManager[R]) -> R:
+        value = await type(manager).__aenter__(manager)
+        self._exits.append(manager.__aexit__)
+        self._is_sync.append(False)
+        return value
+
+    def callback(self, func: Callable[..., Any], /, *args: Any) -> None:
+        self._exits.append(lambda *_: func(*args))
+        self._is_sync.append(True)
+
+    def push_async_callback(self, func: Callable[..., Awaitable[Any]], /, *args: Any) -> None:
+        self._exits.append(lambda *_: func(*args))
+        self._is_sync.append(False)
+
+    async def aclose(self) -> None:
+        await self.__aexit__(None, None, None)
+
+    async def __aenter__(self) -> AsyncCallbackStack:
+        return self
+
+    async def __aexit__(self, *exc_details: Any) -> bool:
+        received_exc = exc_details[0] is not None
+        frame_exc = sys.exc_info()[1]
+        suppressed_exc = False
+        pending_raise = False
+        exits = self._exits
+        is_sync = self._is_sync
+        while exits:
+            callback, sync = exits.pop(), is_sync.pop()
+            try:
+                result = callback(*exc_details)
+                if result if sync else await result:
+                    suppressed_exc = True
+                    pending_raise = False
+                    exc_details = (None, None, None)
+            except BaseException:  # noqa: BLE001
+                new_exc_details = sys.exc_info()
+                _fix_exception_context(new_exc_details[1], exc_details[1], frame_exc)
+                pending_raise = True
+                exc_details = new_exc_details
+        if pending_raise:
+            _reraise(exc_details[1])
+        return received_exc and suppressed_exc
+
+
+def _fix_exception_context(
+    new_exc: BaseException | None, old_exc: BaseException | None, frame_exc: BaseException | None
+) -> None:
+    # same as ExitStack - simulate the exception chain of nested with statements
+    while new_exc is not None:
+        exc_context = new_exc.__context__
+        if exc_context is None or exc_context is old_exc:
+            return
+        if exc_context is frame_exc:
+            break
+        new_exc = exc_context
+    if new_exc is not None:
+        new_exc.__context__ = old_exc
+
+
+def _reraise(exc: BaseException | None) -> None:
+    fixed_ctx = exc.__context__  # type: ignore[reportOptionalMemberAccess]
+    try:
+        raise exc  # type: ignore[reportGeneralTypeIssues]  # noqa: TRY301
+    except BaseException:
+        exc.__context__ = fixed_ctx  # type: ignore[reportOptionalMemberAccess]
+        raise
+
+
+SyncStack: TypeAlias = "ExitStack | AsyncExitStack | CallbackStack | AsyncCallbackStack"
+"""A stack that sync contexts can be entered into."""
+AsyncStack: TypeAlias = "AsyncExitStack | AsyncCallbackStack"
+"""A stack that sync and async contexts can be entered into."""
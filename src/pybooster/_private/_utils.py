@@ -15,6 +15,7 @@ from typing import Callable
 from typing import ParamSpec
 from typing import TypedDict
 from typing import TypeVar
+from typing import Union
 from typing import get_args
 from typing import get_origin
 from typing import get_type_hints
@@ -40,13 +41,38 @@ undefined = make_sentinel_value(__name__, "undefined")
 NormDependencies = Mapping[str, Sequence[type]]
 """Dependencies normalized to a mapping of parameter names to their possible types."""
 
+_INJECTED_ATTR = "_pybooster_injected_"
+
+
+def mark_injected(func: Callable, dependencies: NormDependencies, *, sync: bool) -> None:
+    # Stored as an attribute so it survives functools.wraps (which copies __dict__).
+    setattr(func, _INJECTED_ATTR, (dependencies, sync))
+
+
+def get_injected(func: Any) -> tuple[NormDependencies, bool] | None:
+    return getattr(func, _INJECTED_ATTR, None) if callable(func) else None
+
 
 def get_callable_dependencies(func: Callable, dependencies: Dependencies | None = None) -> NormDependencies:
     if dependencies is not None:
-        return {name: cls if isinstance(cls, Sequence) else (cls,) for name, cls in dependencies.items()}
+        return {name: tuple(cls) if isinstance(cls, Sequence) else (cls,) for name, cls in dependencies.items()}
     return _get_callable_dependencies(func)
 
 
+def get_class_dependencies(cls: type, dependencies: Dependencies | None = None) -> NormDependencies:
+    if dependencies is not None:
+        return get_callable_dependencies(cls, dependencies)
+    hints = get_type_hints(cls, include_extras=True)
+    # dataclasses with slots keep field defaults out of the class' namespace
+    fields = getattr(cls, "__dataclass_fields__", {})
+    return {
+        name: normalize_dependency(hint)
+        for name, hint in hints.items()
+        if getattr(cls, name, None) is pybooster.required
+        or (name in fields and fields[name].default is pybooster.required)
+    }
+
+
 def _get_callable_dependencies(func: Callable[P, R]) -> NormDependencies:
     dependencies: dict[str, Sequence[type]] = {}
     hints = get_type_hints(func, include_extras=True)
@@ -61,14 +87,14 @@ def _get_callable_dependencies(func: Callable[P, R]) -> NormDependencies:
 
 def normalize_dependency(types: type[R] | Sequence[type[R]]) -> Sequence[type[R]]:
     if isinstance(types, Sequence):
-        return [c for cls in types for c in normalize_dependency(cls)]
+        return tuple(c for cls in types for c in normalize_dependency(cls))
 
     cls = types
     if isinstance(cls, type) and cls.__module__ == "builtins" and getattr(builtins, cls.__name__, None) is cls:
         msg = f"Cannot provide built-in type {cls.__module__}.{cls} - use NewType to make a distinct subtype."
         raise TypeError(msg)
 
-    return normalize_dependency(get_args(cls)) if get_origin(cls) is UnionType else (cls,)
+    return normalize_dependency(get_args(cls)) if get_origin(cls) in (Union, UnionType) else (cls,)
 
 
 class DependencyInfo(TypedDict):
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Any
+from typing import NamedTuple
+
+from pybooster._private import _diagnostics
+from pybooster._private._diagnostics import Tracker
+
+
+class ProviderReport(NamedTuple):
+    """A summary of the values produced by a provider."""
+
+    name: str
+    """The name of the provider."""
+    live: int
+    """The number of values that have not been exited yet."""
+    outlived: int
+    """The number of values that were exited but are still in memory."""
+    size: int
+    """The approximate number of bytes held by live and outlived values."""
+    oldest: float
+    """The age in seconds of the oldest value still in memory."""
+    created: int
+    """The total number of values created."""
+    exited: int
+    """The total number of values exited."""
+
+
+class ValueReport(NamedTuple):
+    """A value that is still in memory."""
+
+    name: str
+    """The name of the provider that produced the value."""
+    value: Any
+    """The value (or None if it cannot be weakly referenced)."""
+    age: float
+    """The number of seconds since the value was created."""
+    size: int
+    """The approximate size of the value in bytes."""
+    exited: bool
+    """Whether the value's provider has been exited."""
+
+
+def enable(*, trace_memory: bool = False) -> None:
+    """Start tracking the values produced by providers.
+
+    Args:
+        trace_memory: Whether to estimate sizes using `tracemalloc` (which will be started
+            if it is not already) rather than only `sys.getsizeof`.
+    """
+    disable()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _diagnostics.TRACKER = Tracker(trace_memory=trace_memory, started_tracing=started_tracing)
+
+
+def disable() -> None:
+    """Stop tracking the values produced by providers and discard what was tracked."""
+    if (tracker := _diagnostics.TRACKER) is not None:
+        _diagnostics.TRACKER = None
+        if tracker.started_tracing:
+            tracemalloc.stop()
+
+
+def report(top: int | None = None) -> list[ProviderReport]:
+    """Summarize the values produced by each provider - largest first.
+
+    Args:
+        top: The maximum number of providers to report on.
+    """
+    tracker = _get_tracker()
+    now = time.monotonic()
+    reports: dict[str, ProviderReport] = {
+        name: ProviderReport(name, 0, 0, 0, 0.0, created, tracker.exited.get(name, 0))
+        for name, created in tracker.created.items()
+    }
+    for record in list(tracker.records.values()):
+        prior = reports[record.name]
+        reports[record.name] = prior._replace(
+            live=prior.live + (record.exited is None),
+            outlived=prior.outlived + (record.exited is not None),
+            size=prior.size + record.size,
+            oldest=max(prior.oldest, now - record.created),
+        )
+    return sorted(reports.values(), key=lambda r: (r.size, r.live + r.outlived), reverse=True)[:top]
+
+
+def values(min_age: float = 0) -> list[ValueReport]:
+    """List values that are still in memory - oldest first.
+
+    This includes values that are still in use as well as those that outlived their scope
+    because something kept a reference to them after their provider was exited.
+
+    Args:
+        min_age: Only include values that were created at least this many seconds ago.
+    """
+    tracker = _get_tracker()
+    now = time.monotonic()
+    reports = [
+        ValueReport(
+            name=record.name,
+            value=None if record.ref is None else record.ref(),
+            age=now - record.created,
+            size=record.size,
+            exited=record.exited is not None,
+        )
+        for record in list(tracker.records.values())
+        if now - record.created >= min_age
+    ]
+    return sorted(reports, key=lambda r: r.age, reverse=True)
+
+
+def _get_tracker() -> Tracker:
+    if (tracker := _diagnostics.TRACKER) is None:
+        msg = "Diagnostics are not enabled."
+        raise RuntimeError(msg)
+    return tracker
@@ -2,31 +2,46 @@ from __future__ import annotations
 
 from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
-from contextlib import AsyncExitStack
-from contextlib import ExitStack
 from contextlib import asynccontextmanager as _asynccontextmanager
 from contextlib import contextmanager as _contextmanager
+from contextvars import ContextVar
 from functools import wraps
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Callable
-from typing import Literal
 from typing import ParamSpec
+from typing import TypeAlias
 from typing import TypeVar
 
 from paramorator import paramorator
 
+from pybooster._private._bridge import LoopBridge
+from pybooster._private._class import make_injected_class
+from pybooster._private._injector import SharedSlot
+from pybooster._private._injector import async_enter_dependency
 from pybooster._private._injector import async_shared_context
 from pybooster._private._injector import async_update_arguments_by_initializing_dependencies
+from pybooster._private._injector import enter_environment
+from pybooster._private._injector import exit_environment
+from pybooster._private._injector import get_environment
+from pybooster._private._injector import get_shared_dependency
+from pybooster._private._injector import get_shared_value
+from pybooster._private._injector import set_environment
+from pybooster._private._injector import set_shared_slot
 from pybooster._private._injector import setdefault_arguments_with_initialized_dependencies
+from pybooster._private._injector import sync_enter_dependency
 from pybooster._private._injector import sync_shared_context
 from pybooster._private._injector import sync_update_arguments_by_initializing_dependencies
+from pybooster._private._limits import get_deadline
+from pybooster._private._provider import set_provider_bridge
+from pybooster._private._stack import AsyncCallbackStack
+from pybooster._private._stack import CallbackStack
 from pybooster._private._utils import get_callable_dependencies
+from pybooster._private._utils import get_class_dependencies
+from pybooster._private._utils import mark_injected
 from pybooster._private._utils import normalize_dependency
 from pybooster._private._utils import undefined
-
-if TYPE_CHECKING:
-    from collections.abc import Sequence
+from pybooster.types import ProviderMissingError
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
@@ -34,12 +49,15 @@ if TYPE_CHECKING:
     from collections.abc import Iterator
     from collections.abc import Sequence
 
+    from pybooster._private._injector import Environment
+    from pybooster._private._utils import NormDependencies
     from pybooster.types import AsyncIteratorCallable
     from pybooster.types import Dependencies
     from pybooster.types import IteratorCallable
 
 P = ParamSpec("P")
 R = TypeVar("R")
+T = TypeVar("T")
 
 
 @paramorator
@@ -60,10 +78,11 @@ def function(
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
         if not (missing := setdefault_arguments_with_initialized_dependencies(kwargs, dependencies)):
             return func(*args, **kwargs)
-        with ExitStack() as stack:
+        with CallbackStack() as stack:
             sync_update_arguments_by_initializing_dependencies(stack, kwargs, missing)
             return func(*args, **kwargs)
 
+    mark_injected(wrapper, dependencies, sync=True)
     return wrapper
 
 
@@ -72,18 +91,27 @@ def asyncfunction(
     func: Callable[P, Coroutine[Any, Any, R]],
     *,
     dependencies: Dependencies | None = None,
+    timeout: float | None = None,
 ) -> Callable[P, Coroutine[Any, Any, R]]:
-    """Inject dependencies into the given coroutine."""
+    """Inject dependencies into the given coroutine.
+
+    Args:
+        func: The coroutine function to inject dependencies into.
+        dependencies: The dependencies to inject into the function.
+        timeout: How long to wait for all async providers to be entered before cancelling
+            them and raising a `ProviderTimeoutError`.
+    """
     dependencies = get_callable_dependencies(func, dependencies)
 
     @wraps(func)
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:  # type: ignore[reportReturnType]
         if not (missing := setdefault_arguments_with_initialized_dependencies(kwargs, dependencies)):
             return await func(*args, **kwargs)
-        async with AsyncExitStack() as stack:
-            await async_update_arguments_by_initializing_dependencies(stack, kwargs, missing)
+        async with AsyncCallbackStack() as stack:
+            await async_update_arguments_by_initializing_dependencies(stack, kwargs, missing, get_deadline(timeout))
             return await func(*args, **kwargs)
 
+    mark_injected(wrapper, dependencies, sync=False)
     return wrapper
 
 
@@ -102,13 +130,14 @@ def iterator(
             if not (missing := setdefault_arguments_with_initialized_dependencies(kwargs, dependencies)):
                 yield from func(*args, **kwargs)
                 return
-            with ExitStack() as stack:
+            with CallbackStack() as stack:
                 sync_update_arguments_by_initializing_dependencies(stack, kwargs, missing)
                 yield from func(*args, **kwargs)
                 return
         except StopIteration as e:
             return e.value  # noqa: B901
 
+    mark_injected(wrapper, dependencies, sync=True)
     return wrapper
 
 
@@ -117,25 +146,65 @@ def asynciterator(
     func: AsyncIteratorCallable[P, R],
     *,
     dependencies: Dependencies | None = None,
+    timeout: float | None = None,
 ) -> AsyncIteratorCallable[P, R]:
-    """Inject dependencies into the given async iterator."""
+    """Inject dependencies into the given async iterator.
+
+    If every dependency is already [shared][pybooster.injector.shared] (or passed
+    explicitly) the iterator returned by `func` is handed back as-is so iterating it has
+    no added overhead. Otherwise providers are entered on the first iteration and exited
+    once the iterator is exhausted or closed.
+
+    Args:
+        func: The async iterator function to inject dependencies into.
+        dependencies: The dependencies to inject into the function.
+        timeout: How long to wait for all async providers to be entered before cancelling
+            them and raising a `ProviderTimeoutError`.
+    """
     dependencies = get_callable_dependencies(func, dependencies)
 
     @wraps(func)
-    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[R]:
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[R]:
         if not (missing := setdefault_arguments_with_initialized_dependencies(kwargs, dependencies)):
-            async for value in func(*args, **kwargs):
-                yield value
-            return
-        async with AsyncExitStack() as stack:
-            await async_update_arguments_by_initializing_dependencies(stack, kwargs, missing)
-            async for value in func(*args, **kwargs):
-                yield value
-            return
+            return func(*args, **kwargs)
+        return _async_iterator_with_dependencies(func, args, kwargs, missing, timeout)
 
+    mark_injected(wrapper, dependencies, sync=False)
     return wrapper
 
 
+async def _async_iterator_with_dependencies(
+    func: AsyncIteratorCallable[..., R],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    missing: NormDependencies,
+    seconds: float | None,
+) -> AsyncIterator[R]:
+    async with AsyncCallbackStack() as stack:
+        await async_update_arguments_by_initializing_dependencies(stack, kwargs, missing, get_deadline(seconds))
+        iterator = func(*args, **kwargs)
+        anext_ = iterator.__anext__
+        # An async equivalent of 'yield from' so that values sent or exceptions thrown
+        # into this iterator (e.g. by asynccontextmanager) reach the wrapped one.
+        try:
+            value = await anext_()
+            while True:
+                try:
+                    sent = yield value
+                except GeneratorExit:  # noqa: PERF203
+                    if (aclose := getattr(iterator, "aclose", None)) is not None:
+                        await aclose()
+                    raise
+                except BaseException as exc:
+                    if (athrow := getattr(iterator, "athrow", None)) is None:
+                        raise
+                    value = await athrow(exc)
+                else:
+                    value = await (anext_() if sent is None else iterator.asend(sent))  # type: ignore[reportAttributeAccessIssue]
+        except StopAsyncIteration:
+            return
+
+
 @paramorator
 def contextmanager(
     func: IteratorCallable[P, R],
@@ -151,63 +220,146 @@ def asynccontextmanager(
     func: AsyncIteratorCallable[P, R],
     *,
     dependencies: Dependencies | None = None,
+    timeout: float | None = None,
 ) -> Callable[P, AbstractAsyncContextManager[R]]:
-    """Inject dependencies into the given async context manager function."""
-    return _asynccontextmanager(asynciterator(func, dependencies=dependencies))
+    """Inject dependencies into the given async context manager function.
+
+    Args:
+        func: The async iterator function to inject dependencies into.
+        dependencies: The dependencies to inject into the function.
+        timeout: How long to wait for all async providers to be entered before cancelling
+            them and raising a `ProviderTimeoutError`.
+    """
+    return _asynccontextmanager(asynciterator(func, dependencies=dependencies, timeout=timeout))
+
+
+@paramorator
+def cls(
+    klass: type[T],
+    *,
+    dependencies: Dependencies | None = None,
+    lazy: bool = False,
+    slots: bool = False,
+) -> type[T]:
+    """Inject dependencies into the attributes of the given class when it is constructed.
+
+    Dependencies are declared as annotated class attributes whose value is `required`.
+    They are resolved once by a generated `__init__` (which then calls the class' own
+    `__init__`) so methods can use them without any per-call overhead. Dependencies that
+    are also parameters of the class' own `__init__` (e.g. dataclass fields) are passed to
+    it instead. Values may also be passed explicitly as keyword arguments. Providers that
+    were entered are exited once the instance has been garbage collected.
+
+    Args:
+        klass: The class to inject dependencies into.
+        dependencies: The dependencies to inject (infered from annotations if not provided).
+        lazy: Whether to resolve each dependency the first time it is accessed instead.
+        slots: Whether to recreate the class with `__slots__` for its dependencies.
+    """
+    return make_injected_class(klass, get_class_dependencies(klass, dependencies), lazy=lazy, slots=slots)
 
 
 def current(cls: type[R]) -> _CurrentContext[R]:
-    """Get the current value of a dependency."""
+    """Get the current value of a dependency.
+
+    The returned context manager may be reused and re-entered, even concurrently by
+    different tasks or threads, so it can be created once outside of a hot loop. Each
+    entry is exited by the context that entered it, or if it is exited from another
+    context (e.g. the teardown of an async fixture) the latest entry is exited.
+    """
     return _CurrentContext(normalize_dependency(cls))
 
 
+def get(cls: type[R], default: R = undefined) -> R:
+    """Get the value of a dependency that has been [shared][pybooster.injector.shared].
+
+    Unlike `current` this never executes a provider so it can be used in sync or async
+    code alike and costs no more than a single lookup.
+
+    Args:
+        cls: The dependency to get.
+        default: The value to return if the dependency is not shared.
+
+    Raises:
+        ProviderMissingError: If the dependency is not shared and no default was given.
+    """
+    if (value := get_shared_value(cls)) is not undefined:
+        return value
+    if default is not undefined:
+        return default
+    msg = f"No shared value for {cls}"
+    raise ProviderMissingError(msg)
+
+
 class _CurrentContext(AbstractContextManager[R], AbstractAsyncContextManager[R]):
     """A context manager to provide the current value of a dependency."""
 
+    __slots__ = ("_entries", "types")
+
     def __init__(self, types: Sequence[type[R]]) -> None:
         self.types = types
+        self._entries: dict[int, _CurrentEntry] = {}
 
     def __enter__(self) -> R:
-        if hasattr(self, "_sync_stack"):
-            msg = "Cannot reuse a context manager."
-            raise RuntimeError(msg)
-
-        values: dict[Literal["dependency"], R] = {}
-        if not (missing := setdefault_arguments_with_initialized_dependencies(values, {"dependency": self.types})):  # type: ignore[reportArgumentType]
-            return values["dependency"]
-
-        stack = self._sync_stack = ExitStack()
-
-        sync_update_arguments_by_initializing_dependencies(stack, values, missing)  # type: ignore[reportArgumentType]
-        return values["dependency"]
+        if (value := get_shared_dependency(self.types)) is not undefined:
+            self._push(None)
+            return value
+        stack = CallbackStack()
+        try:
+            value = sync_enter_dependency(stack, self.types)
+        except BaseException:
+            stack.close()
+            raise
+        self._push(stack)
+        return value
 
     async def __aenter__(self) -> R:
-        if hasattr(self, "_async_stack"):
-            msg = "Cannot reuse a context manager."
-            raise RuntimeError(msg)
+        if (value := get_shared_dependency(self.types)) is not undefined:
+            self._push(None)
+            return value
+        stack = AsyncCallbackStack()
+        try:
+            value = await async_enter_dependency(stack, self.types)
+        except BaseException:
+            await stack.aclose()
+            raise
+        self._push(stack)
+        return value
 
-        values: dict[Literal["dependency"], R] = {}
-        if not (missing := setdefault_arguments_with_initialized_dependencies(values, {"dependency": self.types})):  # type: ignore[reportArgumentType]
-            return values["dependency"]
+    def __exit__(self, *exc: Any) -> None:
+        if (stack := self._pop_stack()) is not None:
+            stack.__exit__(*exc)
 
-        stack = self._async_stack = AsyncExitStack()
+    async def __aexit__(self, *exc: Any) -> None:
+        if (stack := self._pop_stack()) is not None:
+            await stack.__aexit__(*exc)  # type: ignore[reportAttributeAccessIssue]
+
+    def _push(self, stack: CallbackStack | AsyncCallbackStack | None) -> None:
+        entry = (self, stack, _CURRENT_STACKS.get())
+        self._entries[id(entry)] = entry
+        _CURRENT_STACKS.set(entry)
+
+    def _pop_stack(self) -> CallbackStack | AsyncCallbackStack | None:
+        entries = self._entries
+        while (entry := _CURRENT_STACKS.get()) is not None and entry[0] is self:
+            _CURRENT_STACKS.set(entry[2])
+            # skip entries that were already exited from another context
+            if entries.pop(id(entry), None) is entry:
+                return entry[1]
+        # entered in another context (e.g. by a different task) so exit the latest entry
+        try:
+            _, (_, stack, _) = entries.popitem()
+        except KeyError:
+            msg = "Context manager was not entered."
+            raise RuntimeError(msg) from None
+        return stack
 
-        await async_update_arguments_by_initializing_dependencies(stack, values, missing)  # type: ignore[reportArgumentType]
-        return values["dependency"]
 
-    def __exit__(self, *exc: Any) -> None:
-        if hasattr(self, "_sync_stack"):
-            try:
-                self._sync_stack.__exit__(*exc)
-            finally:
-                del self._sync_stack
+_CurrentEntry: TypeAlias = "tuple[_CurrentContext, CallbackStack | AsyncCallbackStack | None, _CurrentEntry | None]"
+"""An entry of a current context along with the stack to exit and the entry it was nested in."""
 
-    async def __aexit__(self, *exc: Any) -> None:
-        if hasattr(self, "_async_stack"):
-            try:
-                await self._async_stack.__aexit__(*exc)
-            finally:
-                del self._async_stack
+_CURRENT_STACKS: ContextVar[_CurrentEntry | None] = ContextVar("CURRENT_STACKS", default=None)
+"""The stacks of the current contexts that have been entered (innermost first)."""
 
 
 def shared(cls: type[R] | Sequence, value: R = undefined) -> _SharedContext[R]:
@@ -262,3 +414,167 @@ class _SharedContext(AbstractContextManager[R], AbstractAsyncContextManager[R]):
             await self._async_ctx.__aexit__(*args)
         finally:
             del self._async_ctx
+
+
+def reloadable(cls: type[R] | Sequence, value: R = undefined) -> _ReloadableContext[R]:
+    """Like [shared][pybooster.injector.shared] but the value can be replaced while in use.
+
+    Injections that are already in progress keep the value they started with while new
+    ones get the replacement. A replaced value's context is exited once the last injection
+    using it has finished so replacing a value never blocks injections.
+
+    Args:
+        cls: The dependency to share.
+        value: The initial value to share. If not provided, the dependency will be resolved.
+    """
+    return _ReloadableContext(normalize_dependency(cls), value=value)
+
+
+class _ReloadableContext(
+    AbstractContextManager["_ReloadableContext[R]"], AbstractAsyncContextManager["_ReloadableContext[R]"]
+):
+    """A context manager to declare a replaceable shared instance of a dependency."""
+
+    def __init__(self, types: Sequence[type[R]], value: R) -> None:
+        self.types = types
+        self._initial_value = value
+
+    @property
+    def value(self) -> R:
+        """The current value of the dependency."""
+        return self._get_slot().value
+
+    @property
+    def generation(self) -> int:
+        """The number of times the value has been set (starting at 1)."""
+        return self._get_slot().generation
+
+    def swap(self, value: R) -> None:
+        """Replace the shared value with the given one."""
+        self._get_slot().swap(value)
+
+    def reload(self) -> R:
+        """Replace the shared value with a new one from its sync provider."""
+        return self._get_slot().reload()
+
+    async def areload(self) -> R:
+        """Replace the shared value with a new one from its provider."""
+        return await self._get_slot().areload()
+
+    def __enter__(self) -> _ReloadableContext[R]:
+        self._check_not_entered()
+        slot = SharedSlot(self.types, sync=True)
+        if self._initial_value is undefined:
+            slot.reload()
+        else:
+            slot.swap(self._initial_value)
+        self._slot = slot
+        self._reset = set_shared_slot(slot)
+        return self
+
+    def __exit__(self, *args) -> None:
+        slot = self._slot
+        try:
+            self._reset()
+        finally:
+            del self._slot, self._reset
+            slot.close()
+
+    async def __aenter__(self) -> _ReloadableContext[R]:
+        self._check_not_entered()
+        slot = SharedSlot(self.types, sync=False)
+        if self._initial_value is undefined:
+            await slot.areload()
+        else:
+            slot.swap(self._initial_value)
+        self._slot = slot
+        self._reset = set_shared_slot(slot)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        slot = self._slot
+        try:
+            self._reset()
+        finally:
+            del self._slot, self._reset
+            slot.close()
+            await slot.close_orphans()
+
+    def _check_not_entered(self) -> None:
+        if hasattr(self, "_slot"):
+            msg = "Cannot reuse a context manager."
+            raise RuntimeError(msg)
+
+    def _get_slot(self) -> SharedSlot:
+        try:
+            return self._slot
+        except AttributeError:
+            msg = "Context manager has not been entered."
+            raise RuntimeError(msg) from None
+
+
+def capture() -> _CapturedEnvironment:
+    """Capture the active providers and shared values so they can be activated elsewhere.
+
+    The captured environment is immutable and can be activated in any number of tasks or
+    threads, either with `with env:` or `env.run(func, ...)`. Since every activation uses
+    the same snapshot of providers, dependencies resolved in one are cached for all.
+    """
+    return _CapturedEnvironment(get_environment())
+
+
+class _CapturedEnvironment(AbstractContextManager[None]):
+    """A snapshot of the providers and shared values that were active when it was captured."""
+
+    __slots__ = ("_env",)
+
+    def __init__(self, env: Environment) -> None:
+        self._env = env
+
+    def run(self, func: Callable[P, R], /, *args: P.args, **kwargs: P.kwargs) -> R:
+        """Call the given function within the captured environment."""
+        reset = set_environment(self._env)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            reset()
+
+    def __enter__(self) -> None:
+        enter_environment(self._env)
+
+    def __exit__(self, *args: Any) -> None:
+        exit_environment()
+
+
+def bridge() -> _BridgeContext:
+    """Let sync injectors use async providers by running them on a background event loop.
+
+    While the returned context is entered, dependencies that only have an async provider
+    are entered in a task on a dedicated event loop thread (within the caller's context)
+    and sync code blocks until they are ready. The loop is kept for the lifetime of the
+    context so async resources shared within it can be reused across calls. This is meant
+    for sync programs (e.g. workers or command line tools) and should not be used to call
+    sync injectors from within the bridge's own loop.
+    """
+    return _BridgeContext()
+
+
+class _BridgeContext(AbstractContextManager[None]):
+    """A context manager that runs async providers on a background event loop for sync injectors."""
+
+    __slots__ = ("_bridge", "_reset")
+
+    def __enter__(self) -> None:
+        if hasattr(self, "_bridge"):
+            msg = "Cannot reuse a context manager."
+            raise RuntimeError(msg)
+        self._bridge = loop_bridge = LoopBridge()
+        loop_bridge.start()
+        self._reset = set_provider_bridge(loop_bridge)
+
+    def __exit__(self, *args: Any) -> None:
+        try:
+            self._reset()
+        finally:
+            self._bridge.stop()
+            del self._bridge, self._reset
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from contextlib import AbstractAsyncContextManager
+from contextlib import AsyncExitStack
+from contextlib import ExitStack
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import TypeAlias
+
+from pybooster._private._injector import Environment
+from pybooster._private._injector import async_enter_dependency
+from pybooster._private._injector import get_environment
+from pybooster._private._injector import set_environment
+from pybooster._private._injector import sync_enter_dependency
+from pybooster._private._stack import AsyncCallbackStack
+from pybooster._private._stack import CallbackStack
+from pybooster._private._utils import normalize_dependency
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+    from collections.abc import Iterable
+    from collections.abc import Iterator
+    from collections.abc import Mapping
+    from collections.abc import MutableMapping
+    from collections.abc import Sequence
+    from contextlib import AbstractContextManager
+
+ASGIScope: TypeAlias = "MutableMapping[str, Any]"
+"""The connection scope of an ASGI request."""
+ASGIMessage: TypeAlias = "MutableMapping[str, Any]"
+"""A message sent to or received from an ASGI server."""
+ASGIReceive: TypeAlias = "Callable[[], Awaitable[ASGIMessage]]"
+"""A function that receives messages from an ASGI server."""
+ASGISend: TypeAlias = "Callable[[ASGIMessage], Awaitable[None]]"
+"""A function that sends messages to an ASGI server."""
+ASGIApp: TypeAlias = "Callable[[ASGIScope, ASGIReceive, ASGISend], Awaitable[None]]"
+"""An ASGI application."""
+
+WSGIEnviron: TypeAlias = "dict[str, Any]"
+"""The environment of a WSGI request."""
+WSGIStartResponse: TypeAlias = "Callable[..., Any]"
+"""The function a WSGI application calls to start its response."""
+WSGIApp: TypeAlias = "Callable[[WSGIEnviron, WSGIStartResponse], Iterable[bytes]]"
+"""A WSGI application."""
+
+
+class ASGIMiddleware:
+    """Make providers and shared values available to every request of an ASGI app.
+
+    The given scopes are entered once when the server sends a lifespan startup event (or
+    before the first request if the server does not support lifespan events) and exited
+    on shutdown. Both happen in a task owned by the middleware so that the scopes are
+    exited in the same context they were entered in no matter which request started them.
+    Each request then activates a snapshot of those scopes along with its own shared
+    values so the per-request cost does not depend on how many scopes there are.
+
+    Args:
+        app: The ASGI application to wrap.
+        scopes: Provider scopes or other context managers to enter on startup.
+        values: A function that returns values to share for each request given its scope.
+        shared: Dependencies to resolve and share for the duration of each request.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        scopes: Sequence[AbstractContextManager | AbstractAsyncContextManager] = (),
+        values: Callable[[ASGIScope], Mapping[type, Any]] | None = None,
+        shared: Sequence[type | Sequence[type]] = (),
+    ) -> None:
+        self.app = app
+        self._scopes = scopes
+        self._values = values
+        self._shared = [normalize_dependency(types) for types in shared]
+        self._env: Environment | None = None
+        self._ready: asyncio.Future[Environment] | None = None
+        self._stopping: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def __call__(self, scope: ASGIScope, receive: ASGIReceive, send: ASGISend) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] == "lifespan":
+            await self.app(scope, self._wrap_lifespan_receive(receive), self._wrap_lifespan_send(send))
+            return
+        if (env := self._env) is None:
+            env = await self.startup()
+        if (get_values := self._values) is not None:
+            env = env._replace(shared_values={**env.shared_values, **get_values(scope)})
+        reset = set_environment(env)
+        try:
+            if not self._shared:
+                await self.app(scope, receive, send)
+                return
+            async with AsyncCallbackStack() as stack:
+                values = {}
+                for types in self._shared:
+                    values.update(dict.fromkeys(types, await async_enter_dependency(stack, types)))
+                reset_shared = set_environment(env._replace(shared_values={**env.shared_values, **values}))
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    reset_shared()
+        finally:
+            reset()
+
+    async def startup(self) -> Environment:
+        """Enter the middleware's scopes (if they have not been already)."""
+        if (env := self._env) is not None:
+            return env
+        if (ready := self._ready) is None:
+            # requests that arrive while the scopes are being entered wait for the same result
+            ready = self._ready = asyncio.get_running_loop().create_future()
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run(ready, self._stopping), name="pybooster-asgi-scopes")
+        # a cancelled request must not cancel the startup other requests are waiting for
+        return await asyncio.shield(ready)
+
+    async def shutdown(self) -> None:
+        """Exit the middleware's scopes."""
+        if (task := self._task) is not None and (stopping := self._stopping) is not None:
+            self._env = self._ready = self._stopping = self._task = None
+            stopping.set()
+            await task
+
+    async def _run(self, ready: asyncio.Future[Environment], stopping: asyncio.Event) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                for scope in self._scopes:
+                    if isinstance(scope, AbstractAsyncContextManager):
+                        await stack.enter_async_context(scope)
+                    else:
+                        stack.enter_context(scope)
+                self._env = env = get_environment()
+                ready.set_result(env)
+                await stopping.wait()
+        except BaseException as error:
+            if ready.done():
+                raise
+            # allow a later request to try again
+            self._env = self._ready = self._stopping = self._task = None
+            ready.set_exception(error)
+
+    def _wrap_lifespan_receive(self, receive: ASGIReceive) -> ASGIReceive:
+        async def wrapper() -> ASGIMessage:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+            return message
+
+        return wrapper
+
+    def _wrap_lifespan_send(self, send: ASGISend) -> ASGISend:
+        async def wrapper(message: ASGIMessage) -> None:
+            if message["type"] in ("lifespan.shutdown.complete", "lifespan.shutdown.failed"):
+                await self.shutdown()
+            await send(message)
+
+        return wrapper
+
+
+class WSGIMiddleware:
+    """Make providers and shared values available to every request of a WSGI app.
+
+    The given scopes are entered immediately and exited by calling `close`. Each request
+    runs in a copy of the server's context that activates a snapshot of those scopes along with its own
+    shared values. Anything entered for the request is exited once the server closes
+    the response.
+
+    Args:
+        app: The WSGI application to wrap.
+        scopes: Provider scopes or other context managers to enter.
+        values: A function that returns values to share for each request given its environ.
+        shared: Dependencies to resolve and share for the duration of each request.
+    """
+
+    def __init__(
+        self,
+        app: WSGIApp,
+        *,
+        scopes: Sequence[AbstractContextManager] = (),
+        values: Callable[[WSGIEnviron], Mapping[type, Any]] | None = None,
+        shared: Sequence[type | Sequence[type]] = (),
+    ) -> None:
+        self.app = app
+        self._values = values
+        self._shared = [normalize_dependency(types) for types in shared]
+        self._context = contextvars.copy_context()
+        self._stack = ExitStack()
+        self._env: Environment = self._context.run(self._startup, scopes)
+
+    def __call__(self, environ: WSGIEnviron, start_response: WSGIStartResponse) -> Iterable[bytes]:
+        """Handle a WSGI request."""
+        context = contextvars.copy_context()
+        return context.run(self._call, context, environ, start_response)
+
+    def close(self) -> None:
+        """Exit the middleware's scopes."""
+        self._context.run(self._stack.close)
+
+    def _startup(self, scopes: Sequence[AbstractContextManager]) -> Environment:
+        try:
+            for scope in scopes:
+                self._stack.enter_context(scope)
+        except BaseException:
+            self._stack.close()
+            raise
+        return get_environment()
+
+    def _call(
+        self,
+        context: contextvars.Context,
+        environ: WSGIEnviron,
+        start_response: WSGIStartResponse,
+    ) -> Iterable[bytes]:
+        # the copied context is discarded after the request so there is nothing to reset
+        env = self._env
+        if (get_values := self._values) is not None:
+            env = env._replace(shared_values={**env.shared_values, **get_values(environ)})
+        set_environment(env)
+        stack = CallbackStack()
+        try:
+            if self._shared:
+                values = {}
+                for types in self._shared:
+                    values.update(dict.fromkeys(types, sync_enter_dependency(stack, types)))
+                set_environment(env._replace(shared_values={**env.shared_values, **values}))
+            response = self.app(environ, start_response)
+        except BaseException:
+            stack.close()
+            raise
+        return _WSGIResponse(context, response, stack)
+
+
+class _WSGIResponse:
+    """Iterates over a WSGI response within a request's context and cleans up when closed."""
+
+    __slots__ = ("_context", "_iterator", "_response", "_stack")
+
+    def __init__(self, context: contextvars.Context, response: Iterable[bytes], stack: CallbackStack) -> None:
+        self._context = context
+        self._response = response
+        self._iterator: Iterator[bytes] | None = None
+        self._stack = stack
+
+    def __iter__(self) -> _WSGIResponse:
+        return self
+
+    def __next__(self) -> bytes:
+        if (iterator := self._iterator) is None:
+            iterator = self._iterator = self._context.run(iter, self._response)
+        return self._context.run(next, iterator)
+
+    def close(self) -> None:
+        self._context.run(self._close)
+
+    def _close(self) -> None:
+        with self._stack:
+            if (close := getattr(self._response, "close", None)) is not None:
+                close()
@@ -4,11 +4,15 @@ from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
 from contextlib import asynccontextmanager as _asynccontextmanager
 from contextlib import contextmanager as _contextmanager
+from contextlib import nullcontext
+from functools import partial
 from functools import wraps
 from typing import TYPE_CHECKING
+from typing import Any
 from typing import Callable
 from typing import Generic
 from typing import Literal
+from typing import NamedTuple
 from typing import ParamSpec
 from typing import TypeAlias
 from typing import TypeVar
@@ -17,7 +21,18 @@ from typing import cast
 from paramorator import paramorator
 
 from pybooster import injector
+from pybooster._private._cache import AsyncScopeCache
+from pybooster._private._cache import SyncScopeCache
+from pybooster._private._limits import ConcurrencyLimiter
+from pybooster._private._limits import async_timeout
+from pybooster._private._provider import ProviderOverride
 from pybooster._private._provider import set_provider
+from pybooster._private._provider import set_provider_overrides
+from pybooster._private._sharedmem import Segment
+from pybooster._private._sharedmem import delete_segment
+from pybooster._private._sharedmem import map_segment
+from pybooster._private._sharedmem import unmap_segment
+from pybooster._private._sharedmem import write_segment
 from pybooster._private._utils import get_callable_dependencies
 from pybooster._private._utils import get_callable_return_type
 from pybooster._private._utils import get_coroutine_return_type
@@ -27,12 +42,14 @@ if TYPE_CHECKING:
     from collections.abc import AsyncIterator
     from collections.abc import Awaitable
     from collections.abc import Iterator
+    from collections.abc import Mapping
     from collections.abc import Sequence
 
     from pybooster.types import AsyncContextManagerCallable
     from pybooster.types import AsyncIteratorCallable
     from pybooster.types import ContextManagerCallable
     from pybooster.types import Dependencies
+    from pybooster.types import ForkBehavior
     from pybooster.types import IteratorCallable
 
 P = ParamSpec("P")
@@ -45,6 +62,9 @@ def function(
     *,
     dependencies: Dependencies | None = None,
     provides: type[R] | None = None,
+    max_concurrent: int | None = None,
+    acquire_timeout: float | None = None,
+    on_fork: ForkBehavior = "share",
 ) -> SyncProvider[P, R]:
     """Create a provider from the given function.
 
@@ -52,6 +72,9 @@ def function(
         func: The function to create a provider from.
         dependencies: The dependencies of the function (infered if not provided).
         provides: The type that the function provides (infered if not provided).
+        max_concurrent: The maximum number of values the provider may have in use at once.
+        acquire_timeout: How long to wait for a value when `max_concurrent` is reached.
+        on_fork: What forked processes do with a value that was shared before forking.
     """
     provides = provides or get_callable_return_type(func)
 
@@ -59,7 +82,16 @@ def function(
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> Iterator[R]:
         yield func(*args, **kwargs)
 
-    return iterator(wrapper, provides=provides, dependencies=dependencies)
+    return _make_sync_provider(
+        wrapper,
+        dependencies,
+        provides,
+        teardown=False,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        on_fork=on_fork,
+        manager=_function_contextmanager(func),
+    )
 
 
 @paramorator
@@ -68,6 +100,10 @@ def asyncfunction(
     *,
     dependencies: Dependencies | None = None,
     provides: type[R] | None = None,
+    max_concurrent: int | None = None,
+    acquire_timeout: float | None = None,
+    timeout: float | None = None,
+    on_fork: ForkBehavior = "share",
 ) -> AsyncProvider[P, R]:
     """Create a provider from the given coroutine.
 
@@ -75,6 +111,10 @@ def asyncfunction(
         func: The function to create a provider from.
         dependencies: The dependencies of the function (infered if not provided).
         provides: The type that the function provides (infered if not provided).
+        max_concurrent: The maximum number of values the provider may have in use at once.
+        acquire_timeout: How long to wait for a value when `max_concurrent` is reached.
+        timeout: How long to wait for the value to be created before cancelling it.
+        on_fork: What forked processes do with a value that was shared before forking.
     """
     provides = provides or get_coroutine_return_type(func)
 
@@ -82,7 +122,17 @@ def asyncfunction(
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncIterator[R]:
         yield await func(*args, **kwargs)
 
-    return asynciterator(wrapper, provides=provides, dependencies=dependencies)
+    return _make_async_provider(
+        wrapper,
+        dependencies,
+        provides,
+        teardown=False,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        timeout=timeout,
+        on_fork=on_fork,
+        manager=_asyncfunction_contextmanager(func),
+    )
 
 
 @paramorator
@@ -91,6 +141,9 @@ def iterator(
     *,
     dependencies: Dependencies | None = None,
     provides: type[R] | None = None,
+    max_concurrent: int | None = None,
+    acquire_timeout: float | None = None,
+    on_fork: ForkBehavior = "share",
 ) -> SyncProvider[P, R]:
     """Create a provider from the given iterator function.
 
@@ -98,13 +151,19 @@ def iterator(
         func: The function to create a provider from.
         dependencies: The dependencies of the function (infered if not provided).
         provides: The type that the function provides (infered if not provided).
+        max_concurrent: The maximum number of values the provider may have in use at once.
+        acquire_timeout: How long to wait for a value when `max_concurrent` is reached.
+        on_fork: What forked processes do with a value that was shared before forking.
     """
     provides = provides or get_iterator_yield_type(func, sync=True)
-    norm_dependencies = get_callable_dependencies(func, dependencies)
-    return SyncProvider(
-        injector.contextmanager(func, dependencies=norm_dependencies) if norm_dependencies else _contextmanager(func),
-        cast(type[R], provides),
-        set(norm_dependencies.values()),
+    return _make_sync_provider(
+        func,
+        dependencies,
+        provides,
+        teardown=True,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        on_fork=on_fork,
     )
 
 
@@ -114,6 +173,10 @@ def asynciterator(
     *,
     dependencies: Dependencies | None = None,
     provides: type[R] | None = None,
+    max_concurrent: int | None = None,
+    acquire_timeout: float | None = None,
+    timeout: float | None = None,
+    on_fork: ForkBehavior = "share",
 ) -> AsyncProvider[P, R]:
     """Create a provider from the given async iterator function.
 
@@ -121,20 +184,157 @@ def asynciterator(
         func: The function to create a provider from.
         dependencies: The dependencies of the function (infered if not provided).
         provides: The type that the function provides (infered if not provided).
+        max_concurrent: The maximum number of values the provider may have in use at once.
+        acquire_timeout: How long to wait for a value when `max_concurrent` is reached.
+        timeout: How long to wait for the value to be created before cancelling it.
+        on_fork: What forked processes do with a value that was shared before forking.
     """
     provides = provides or get_iterator_yield_type(func, sync=False)
+    return _make_async_provider(
+        func,
+        dependencies,
+        provides,
+        teardown=True,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        timeout=timeout,
+        on_fork=on_fork,
+    )
+
+
+@paramorator
+def sharedmemory(
+    func: Callable[P, R],
+    *,
+    dependencies: Dependencies | None = None,
+    provides: type[R] | None = None,
+) -> SharedMemoryProvider[P, R]:
+    """Create a provider whose value is created once and shared with other processes.
+
+    The function must return a bytes-like object or NumPy array. When the provider's scope
+    is entered its value is written to shared memory and injected as a read-only view
+    (a `memoryview` or array). The scope returns a picklable handle which other processes
+    can use to inject views of the same memory without copying it.
+
+    Args:
+        func: The function to create a provider from.
+        dependencies: The dependencies of the function (infered if not provided).
+        provides: The type that the function provides (infered if not provided).
+    """
+    provides = provides or get_callable_return_type(func)
+    norm_dependencies = get_callable_dependencies(func, dependencies)
+    if norm_dependencies:
+        func = injector.function(func, dependencies=norm_dependencies)
+    return SharedMemoryProvider(func, cast(type[R], provides), set(norm_dependencies.values()))
+
+
+def _make_sync_provider(
+    func: IteratorCallable[P, R],
+    dependencies: Dependencies | None,
+    provides: type[R],
+    *,
+    teardown: bool,
+    max_concurrent: int | None,
+    acquire_timeout: float | None,
+    on_fork: ForkBehavior,
+    manager: ContextManagerCallable[P, R] | None = None,
+) -> SyncProvider[P, R]:
+    norm_dependencies = get_callable_dependencies(func, dependencies)
+    if norm_dependencies:
+        manager = injector.contextmanager(func, dependencies=norm_dependencies)
+    elif manager is None:
+        manager = _contextmanager(func)
+    return SyncProvider(
+        manager,
+        cast(type[R], provides),
+        set(norm_dependencies.values()),
+        teardown=teardown,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        on_fork=on_fork,
+    )
+
+
+def _make_async_provider(
+    func: AsyncIteratorCallable[P, R],
+    dependencies: Dependencies | None,
+    provides: type[R],
+    *,
+    teardown: bool,
+    max_concurrent: int | None,
+    acquire_timeout: float | None,
+    timeout: float | None,
+    on_fork: ForkBehavior,
+    manager: AsyncContextManagerCallable[P, R] | None = None,
+) -> AsyncProvider[P, R]:
     norm_dependencies = get_callable_dependencies(func, dependencies)
+    if norm_dependencies:
+        manager = injector.asynccontextmanager(func, dependencies=norm_dependencies)
+    elif manager is None:
+        manager = _asynccontextmanager(func)
     return AsyncProvider(
-        (
-            injector.asynccontextmanager(func, dependencies=norm_dependencies)
-            if norm_dependencies
-            else _asynccontextmanager(func)
-        ),
+        manager,
         cast(type[R], provides),
         set(norm_dependencies.values()),
+        teardown=teardown,
+        max_concurrent=max_concurrent,
+        acquire_timeout=acquire_timeout,
+        timeout=timeout,
+        on_fork=on_fork,
     )
 
 
+def _function_contextmanager(func: Callable[P, R]) -> ContextManagerCallable[P, R]:
+    # a cheaper alternative to a generator based context manager for values with no teardown
+    @wraps(func)
+    def manager(*args: P.args, **kwargs: P.kwargs) -> _FunctionContext[R]:
+        return _FunctionContext(func, args, kwargs)
+
+    return manager
+
+
+def _asyncfunction_contextmanager(func: Callable[P, Awaitable[R]]) -> AsyncContextManagerCallable[P, R]:
+    @wraps(func)
+    def manager(*args: P.args, **kwargs: P.kwargs) -> _AsyncFunctionContext[R]:
+        return _AsyncFunctionContext(func, args, kwargs)
+
+    return manager
+
+
+class _FunctionContext(AbstractContextManager[R]):
+    """A context manager whose value is the result of calling a function."""
+
+    __slots__ = ("_args", "_func", "_kwargs")
+
+    def __init__(self, func: Callable[..., R], args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    def __enter__(self) -> R:
+        return self._func(*self._args, **self._kwargs)
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+class _AsyncFunctionContext(AbstractAsyncContextManager[R]):
+    """An async context manager whose value is the result of awaiting a coroutine function."""
+
+    __slots__ = ("_args", "_func", "_kwargs")
+
+    def __init__(self, func: Callable[..., Awaitable[R]], args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+
+    async def __aenter__(self) -> R:
+        return await self._func(*self._args, **self._kwargs)
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
 class SyncProvider(Generic[P, R]):
     """A provider that produces a dependency."""
 
@@ -143,15 +343,52 @@ class SyncProvider(Generic[P, R]):
         manager: ContextManagerCallable[P, R],
         provides: type[R],
         dependency_set: set[Sequence[type]],
+        *,
+        teardown: bool = True,
+        max_concurrent: int | None = None,
+        acquire_timeout: float | None = None,
+        on_fork: ForkBehavior = "share",
     ) -> None:
         self.provides = provides
         self.value: ContextManagerCallable[P, R] = manager
+        self.teardown = teardown
+        self._name = getattr(manager, "__qualname__", repr(manager))
+        self.limiter = (
+            None if max_concurrent is None else ConcurrencyLimiter(self._name, max_concurrent, acquire_timeout)
+        )
+        """Limits and reports on how many of this provider's values are in use at once."""
+        self.on_fork = on_fork
+        """What forked processes do with a value that was shared before forking."""
         self._dependency_set = dependency_set
         self._sync: Literal[True] = True
 
     def scope(self, *args: P.args, **kwargs: P.kwargs) -> _ProviderScope:
         """Declare this as the provider for the dependency within the context."""
-        return _ProviderScope(self.provides, lambda: self.value(*args, **kwargs), self._dependency_set, sync=True)
+        return _ProviderScope(
+            self.provides,
+            self._make_manager(args, kwargs),
+            self._dependency_set,
+            sync=True,
+            name=self._name,
+            on_fork=self.on_fork,
+        )
+
+    def cached_scope(self, *args: P.args, **kwargs: P.kwargs) -> _ProviderScope:
+        """Like `scope` but the value is created once, when first injected, and reused until the context exits."""
+        return _ProviderScope(
+            self.provides,
+            self._make_manager(args, kwargs),
+            self._dependency_set,
+            sync=True,
+            name=self._name,
+            on_fork=self.on_fork,
+            cache=True,
+        )
+
+    def _make_manager(self, args: Any, kwargs: Any) -> ContextManagerCallable[[], R]:
+        if (limiter := self.limiter) is None:
+            return lambda: self.value(*args, **kwargs)
+        return lambda: limiter.sync_limit(self.value(*args, **kwargs))
 
 
 class AsyncProvider(Generic[P, R]):
@@ -162,15 +399,171 @@ class AsyncProvider(Generic[P, R]):
         manager: AsyncContextManagerCallable[P, R],
         provides: type[R],
         dependency_set: set[Sequence[type]],
+        *,
+        teardown: bool = True,
+        max_concurrent: int | None = None,
+        acquire_timeout: float | None = None,
+        timeout: float | None = None,
+        on_fork: ForkBehavior = "share",
     ) -> None:
         self.provides = provides
         self.value: AsyncContextManagerCallable[P, R] = manager
+        self.teardown = teardown
+        self.timeout = timeout
+        """How long to wait for the provider's value to be entered (not including queueing)."""
+        self._name = getattr(manager, "__qualname__", repr(manager))
+        self.limiter = (
+            None if max_concurrent is None else ConcurrencyLimiter(self._name, max_concurrent, acquire_timeout)
+        )
+        """Limits and reports on how many of this provider's values are in use at once."""
+        self.on_fork = on_fork
+        """What forked processes do with a value that was shared before forking."""
         self._dependency_set = dependency_set
         self._sync: Literal[False] = False
 
     def scope(self, *args: P.args, **kwargs: P.kwargs) -> _ProviderScope:
         """Declare this as the provider for the dependency within the context."""
-        return _ProviderScope(self.provides, lambda: self.value(*args, **kwargs), self._dependency_set, sync=False)
+        return _ProviderScope(
+            self.provides,
+            self._make_manager(args, kwargs),
+            self._dependency_set,
+            sync=False,
+            name=self._name,
+            on_fork=self.on_fork,
+        )
+
+    def cached_scope(self, *args: P.args, **kwargs: P.kwargs) -> _ProviderScope:
+        """Like `scope` but the value is created once, when first injected, and reused until the context exits.
+
+        The returned context must be entered with `async with` so the value can be exited.
+        """
+        return _ProviderScope(
+            self.provides,
+            self._make_manager(args, kwargs),
+            self._dependency_set,
+            sync=False,
+            name=self._name,
+            on_fork=self.on_fork,
+            cache=True,
+        )
+
+    def _make_manager(self, args: Any, kwargs: Any) -> AsyncContextManagerCallable[[], R]:
+        manager = lambda: self.value(*args, **kwargs)  # noqa: E731
+        if (timeout := self.timeout) is not None:
+            # only time the provider itself - waiting for a slot is bounded by acquire_timeout
+            timed_manager = manager
+            manager = lambda: async_timeout(timed_manager(), timeout, self._name)  # noqa: E731
+        if (limiter := self.limiter) is not None:
+            unlimited_manager = manager
+            manager = lambda: limiter.async_limit(unlimited_manager())  # noqa: E731
+        return manager
+
+
+class SharedMemoryProvider(Generic[P, R]):
+    """A provider that puts its dependency in memory that can be shared between processes."""
+
+    def __init__(self, func: Callable[P, R], provides: type[R], dependency_set: set[Sequence[type]]) -> None:
+        self.provides = provides
+        self.value = func
+        self._name = getattr(func, "__qualname__", repr(func))
+        self._dependency_set = dependency_set
+
+    def scope(self, *args: P.args, **kwargs: P.kwargs) -> _SharedMemoryScope:
+        """Create the value and declare this as the provider for the dependency within the context.
+
+        Entering the returned context gives a [handle][pybooster.provider.SharedMemoryHandle]
+        that other processes can use to attach to the value until the context exits.
+        """
+        return _SharedMemoryScope(self.provides, lambda: self.value(*args, **kwargs))
+
+
+class SharedMemoryHandle(NamedTuple):
+    """A picklable reference to a value created by a shared memory provider."""
+
+    provides: Any
+    """The type of the dependency."""
+    segment: Segment
+    """Where the value is stored."""
+
+    def scope(self) -> _SharedMemoryAttachment:
+        """Declare the shared value as the provider for the dependency within the context."""
+        return _SharedMemoryAttachment(self)
+
+
+class _SharedMemoryAttachment(AbstractContextManager[None], AbstractAsyncContextManager[None]):
+    """A context manager that maps a shared value into memory and provides views of it."""
+
+    __slots__ = ("_handle", "_mapped", "_reset")
+
+    def __init__(self, handle: SharedMemoryHandle) -> None:
+        self._handle = handle
+
+    def __enter__(self) -> None:
+        if hasattr(self, "_reset"):
+            msg = "Cannot reuse a context manager."
+            raise RuntimeError(msg)
+        handle = self._handle
+        self._mapped, view = map_segment(handle.segment)
+        try:
+            self._reset = set_provider(
+                handle.provides,
+                partial(nullcontext, view),
+                set(),
+                sync=True,
+                name=f"shared memory of {handle.provides}",
+            )
+        except BaseException:
+            unmap_segment(self._mapped)
+            raise
+
+    def __exit__(self, *args) -> None:
+        try:
+            self._reset()
+        finally:
+            del self._reset
+            unmap_segment(self._mapped)
+
+    async def __aenter__(self) -> None:
+        return self.__enter__()
+
+    async def __aexit__(self, *args) -> None:
+        return self.__exit__(*args)
+
+
+class _SharedMemoryScope(AbstractContextManager[SharedMemoryHandle], AbstractAsyncContextManager[SharedMemoryHandle]):
+    """A context manager that creates a shared value and deletes it on exit."""
+
+    def __init__(self, provides: type[R], func: Callable[[], R]) -> None:
+        self._provides = provides
+        self._func = func
+
+    def __enter__(self) -> SharedMemoryHandle:
+        if hasattr(self, "_handle"):
+            msg = "Cannot reuse a context manager."
+            raise RuntimeError(msg)
+        handle = SharedMemoryHandle(self._provides, write_segment(self._func()))
+        attachment = handle.scope()
+        try:
+            attachment.__enter__()
+        except BaseException:
+            delete_segment(handle.segment)
+            raise
+        self._handle = handle
+        self._attachment = attachment
+        return handle
+
+    def __exit__(self, *args) -> None:
+        try:
+            self._attachment.__exit__(*args)
+        finally:
+            delete_segment(self._handle.segment)
+            del self._handle, self._attachment
+
+    async def __aenter__(self) -> SharedMemoryHandle:
+        return self.__enter__()
+
+    async def __aexit__(self, *args) -> None:
+        return self.__exit__(*args)
 
 
 class _ProviderScope(AbstractContextManager[None], AbstractAsyncContextManager[None]):
@@ -183,17 +576,119 @@ class _ProviderScope(AbstractContextManager[None], AbstractAsyncContextManager[N
         dependency_set: set[Sequence[type]],
         *,
         sync: bool,
+        name: str,
+        on_fork: ForkBehavior,
+        cache: bool = False,
     ) -> None:
         self._provides = provides
         self._manager = manager
         self._dependency_set = dependency_set
         self._sync = sync
+        self._name = name
+        self._on_fork = on_fork
+        self._cache_values = cache
+        self._cache: SyncScopeCache | AsyncScopeCache | None = None
+
+    def __enter__(self) -> None:
+        if self._cache_values and not self._sync:
+            msg = f"Cached scope of async provider {self._name} must be entered with 'async with'."
+            raise RuntimeError(msg)
+        self._enter()
+
+    def __exit__(self, *args) -> None:
+        try:
+            self._reset()
+        finally:
+            del self._reset
+            if (cache := self._cache) is not None:
+                self._cache = None
+                cast(SyncScopeCache, cache).close(*args)
+
+    async def __aenter__(self) -> None:
+        self._enter()
+
+    async def __aexit__(self, *args) -> None:
+        try:
+            self._reset()
+        finally:
+            del self._reset
+            if (cache := self._cache) is not None:
+                self._cache = None
+                if isinstance(cache, AsyncScopeCache):
+                    await cache.aclose(*args)
+                else:
+                    cache.close(*args)
+
+    def _enter(self) -> None:
+        if hasattr(self, "_reset"):
+            msg = "Cannot reuse a context manager."
+            raise RuntimeError(msg)
+        manager = self._manager
+        if self._cache_values:
+            cache = self._cache = (
+                SyncScopeCache(manager, self._name)  # type: ignore[reportArgumentType]
+                if self._sync
+                else AsyncScopeCache(manager, self._name)  # type: ignore[reportArgumentType]
+            )
+            manager = cache.manager
+        try:
+            self._reset = set_provider(
+                self._provides,
+                manager,
+                self._dependency_set,
+                sync=self._sync,
+                name=self._name,
+                on_fork=self._on_fork,
+                # the cache records the value it enters once rather than on every injection
+                tracked=not self._cache_values,
+            )
+        except BaseException:
+            self._cache = None
+            raise
+
+
+def override(overrides: Mapping[Any, Any]) -> _OverrideScope:
+    """Replace the providers of some dependencies within a context (e.g. in tests).
+
+    Unlike entering a new `scope` for each dependency, the replacements are layered on
+    top of the active providers without copying them so the cost of an override depends
+    only on how many dependencies it replaces.
+
+    Args:
+        overrides: A mapping of dependencies to the values or providers to replace them with.
+    """
+    return _OverrideScope(
+        [
+            (
+                ProviderOverride(
+                    cls,
+                    value._make_manager((), {}),  # noqa: SLF001
+                    value._dependency_set,  # noqa: SLF001
+                    value._sync,  # noqa: SLF001
+                    value._name,  # noqa: SLF001
+                    value.on_fork,
+                )
+                if isinstance(value, (SyncProvider, AsyncProvider))
+                else ProviderOverride(cls, partial(nullcontext, value), set(), sync=True, name=f"override of {cls}")
+            )
+            for cls, value in overrides.items()
+        ]
+    )
+
+
+class _OverrideScope(AbstractContextManager[None], AbstractAsyncContextManager[None]):
+    """A context manager to replace the providers of some dependencies."""
+
+    __slots__ = ("_overrides", "_reset")
+
+    def __init__(self, overrides: Sequence[ProviderOverride]) -> None:
+        self._overrides = overrides
 
     def __enter__(self) -> None:
         if hasattr(self, "_reset"):
             msg = "Cannot reuse a context manager."
             raise RuntimeError(msg)
-        self._reset = set_provider(self._provides, self._manager, self._dependency_set, sync=self._sync)
+        self._reset = set_provider_overrides(self._overrides)
 
     def __exit__(self, *args) -> None:
         try:
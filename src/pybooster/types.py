@@ -5,6 +5,7 @@ from collections.abc import Sequence
 from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
 from typing import Callable
+from typing import Literal
 from typing import ParamSpec
 from typing import TypeVar
 
@@ -27,9 +28,21 @@ AsyncContextManagerCallable = Callable[P, AbstractAsyncContextManager[R]]
 Dependencies = Mapping[str, type | Sequence[type]]
 """A mapping of parameter names to their possible type or types."""
 
+ForkBehavior = Literal["share", "reinit", "close"]
+"""What a forked process should do with a shared value it inherited from its parent.
+
+- `"share"`: keep using the inherited value.
+- `"reinit"`: lazily create a new value on first use and never tear down the inherited one.
+- `"close"`: tear down the inherited value and fall back to the provider on each use.
+"""
+
 required = make_sentinel_value(__name__, "required")
 """A sentinel object used to indicate that a dependency is required."""
 
 
 class ProviderMissingError(RuntimeError):
     """An error raised when a provider is missing."""
+
+
+class ProviderTimeoutError(TimeoutError):
+    """An error raised when a provider's value does not become available in time."""
@@ -1,15 +1,36 @@
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from types import ModuleType
 from typing import NewType
+from typing import Protocol
+from typing import Union
 
 import pytest
 
+from pybooster import diagnostics
 from pybooster import injector
 from pybooster import provider
 from pybooster import required
+from pybooster.__main__ import main
 from pybooster.types import ProviderMissingError
+from pybooster.types import ProviderTimeoutError
 
 Greeting = NewType("Greeting", str)
 Recipient = NewType("Recipient", str)
 Message = NewType("Message", str)
+Payload = NewType("Payload", memoryview)
 
 
 def test_sync_injection():
@@ -113,3 +134,1418 @@ async def test_sync_provider_cannot_depend_on_async_provider():
         message.scope(),
     ):
         await use_message()
+
+
+def test_dependency_graph_cli(monkeypatch, capsys):
+    @provider.function
+    def greeting() -> Greeting:
+        raise AssertionError  # nocov
+
+    @provider.asynciterator
+    async def recipient() -> AsyncIterator[Recipient]:
+        raise AssertionError  # nocov
+        yield  # nocov
+
+    @provider.asyncfunction
+    async def message(*, _greeting: Greeting = required, _recipient: Recipient = required) -> Message:
+        raise AssertionError  # nocov
+
+    @injector.asyncfunction
+    async def use_message(*, _message: Message = required):
+        raise AssertionError  # nocov
+
+    module = ModuleType("fake_graph_module")
+    vars(module).update(greeting=greeting, recipient=recipient, message=message, use_message=use_message)
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    assert main(["graph", module.__name__]) == 0
+    graph = json.loads(capsys.readouterr().out)
+    nodes = {n["id"].rsplit(".", 1)[-1]: n for n in graph["nodes"]}
+    assert {n: (v["depth"], v["fan_out"], v["teardown"]) for n, v in nodes.items()} == {
+        "greeting": (0, 0, False),
+        "recipient": (0, 0, True),
+        "message": (1, 2, False),
+        "use_message": (2, 1, False),
+    }
+    boundaries = {
+        (e["source"].rsplit(".", 1)[-1], e["target"].rsplit(".", 1)[-1]) for e in graph["edges"] if e["boundary"]
+    }
+    assert boundaries == {("message", "greeting")}
+
+    assert main(["graph", module.__name__, "--format", "dot"]) == 0
+    dot = capsys.readouterr().out
+    assert dot.startswith("digraph pybooster {")
+    assert '"fake_graph_module.message" -> "fake_graph_module.greeting"' in dot
+
+
+def test_dependency_graph_dedupes_reexported_objects(monkeypatch, capsys):
+    def greeting() -> Greeting:
+        raise AssertionError  # nocov
+
+    def use_greeting(*, _greeting: Greeting = required):
+        raise AssertionError  # nocov
+
+    greeting.__module__ = use_greeting.__module__ = "graph_module_a"
+    greeting_provider = provider.function(greeting)
+    injected = injector.function(use_greeting)
+
+    module_a = ModuleType("graph_module_a")
+    vars(module_a).update(greeting=greeting_provider, use_greeting=injected)
+    # another module re-exports them and is scanned first
+    module_b = ModuleType("graph_module_b")
+    vars(module_b).update(greeting=greeting_provider, use_greeting=injected)
+    for module in (module_a, module_b):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    assert main(["graph", module_b.__name__, module_a.__name__]) == 0
+    graph = json.loads(capsys.readouterr().out)
+    assert sorted(n["id"] for n in graph["nodes"]) == ["graph_module_a.greeting", "graph_module_a.use_greeting"]
+    assert [(e["source"], e["target"]) for e in graph["edges"]] == [
+        ("graph_module_a.use_greeting", "graph_module_a.greeting")
+    ]
+
+
+async def test_shared_tuple_item_dependency():
+    @provider.function
+    def greeting_and_recipient() -> tuple[Greeting, Recipient]:
+        return Greeting("Hello"), Recipient("World")
+
+    with greeting_and_recipient.scope():
+        with injector.shared(Recipient) as recipient:
+            assert recipient == "World"
+        async with injector.shared(Greeting) as greeting:
+            assert greeting == "Hello"
+
+
+def test_subclass_and_union_lookups_resolve_most_recent_provider():
+    class Auth:
+        pass
+
+    class AdminAuth(Auth):
+        pass
+
+    @provider.function
+    def auth() -> Auth:
+        return Auth()
+
+    @provider.function
+    def admin_auth() -> AdminAuth:
+        return AdminAuth()
+
+    @injector.function
+    def get_auth(*, auth: Auth = required) -> Auth:
+        return auth
+
+    @injector.function
+    def get_auth_or_message(*, value: Union[Message, Auth] = required) -> object:  # noqa: FA100
+        return value
+
+    with pytest.raises(ProviderMissingError):
+        get_auth()
+
+    with auth.scope():
+        assert type(get_auth()) is Auth
+        with admin_auth.scope():
+            assert type(get_auth()) is AdminAuth
+            assert type(get_auth_or_message()) is AdminAuth
+            with auth.scope():
+                assert type(get_auth()) is Auth
+        assert type(get_auth()) is Auth
+
+    with pytest.raises(ProviderMissingError):
+        get_auth_or_message()
+
+
+def test_lookup_supports_protocols_and_reuses_outer_cache():
+    class Runner(Protocol):
+        def run(self) -> None: ...
+
+    class Auth:
+        pass
+
+    class AdminAuth(Auth):
+        pass
+
+    @provider.function(provides=Runner)
+    def runner() -> object:
+        return "runner"
+
+    @provider.function
+    def auth() -> Auth:
+        return Auth()
+
+    @provider.function
+    def admin_auth() -> AdminAuth:
+        return AdminAuth()
+
+    @injector.function
+    def get_runner(*, runner: Runner = required) -> Runner:
+        return runner
+
+    @injector.function
+    def get_auth(*, auth: Auth = required) -> Auth:
+        return auth
+
+    with runner.scope(), auth.scope():
+        for _ in range(2):
+            # lookups made within short lived scopes are cached by the outer registry
+            with provider.function(provides=Message)(lambda: Message("")).scope():
+                assert get_runner() == "runner"
+                assert type(get_auth()) is Auth
+        # a newer subclass provider invalidates what was cached for its base classes
+        with admin_auth.scope():
+            assert type(get_auth()) is AdminAuth
+        assert type(get_auth()) is Auth
+
+
+async def test_current_context_is_reusable_and_get_reads_shared_values():
+    exits = []
+
+    @provider.iterator
+    def greeting() -> Iterator[Greeting]:
+        try:
+            yield Greeting("Hello")
+        finally:
+            exits.append(True)
+
+    current_greeting = injector.current(Greeting)
+    with greeting.scope():
+        with current_greeting as outer, current_greeting as inner:
+            assert outer == inner == "Hello"
+            assert not exits
+        assert len(exits) == 2
+        async with current_greeting as value:
+            assert value == "Hello"
+        assert len(exits) == 3
+
+        with pytest.raises(ProviderMissingError, match="No shared value"):
+            injector.get(Greeting)
+        assert injector.get(Greeting, None) is None
+
+        with injector.shared(Greeting) as shared:
+            assert injector.get(Greeting) is shared
+            with current_greeting as value:
+                assert value is shared
+        assert len(exits) == 4
+
+
+async def test_async_iterator_injection_delegates_and_tears_down():
+    events = []
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        events.append("enter")
+        try:
+            yield Greeting("Hello")
+        finally:
+            events.append("exit")
+
+    @injector.asynciterator
+    async def greetings(count: int, *, greeting: Greeting = required) -> AsyncIterator[str]:
+        for i in range(count):
+            yield f"{greeting} {i}"
+
+    @injector.asynccontextmanager
+    async def greeting_context(*, greeting: Greeting = required) -> AsyncIterator[Greeting]:
+        try:
+            yield greeting
+        except ValueError:
+            events.append("handled")
+            raise
+
+    with greeting.scope():
+        iterator = greetings(3)
+        assert not events
+        assert [value async for value in iterator] == ["Hello 0", "Hello 1", "Hello 2"]
+        assert events == ["enter", "exit"]
+        assert [value async for value in iterator] == []
+
+        events.clear()
+        iterator = greetings(3)
+        assert await iterator.__anext__() == "Hello 0"
+        await iterator.aclose()
+        assert events == ["enter", "exit"]
+
+        async def raise_in_greeting_context():
+            async with greeting_context() as value:
+                assert value == "Hello"
+                msg = "oops"
+                raise ValueError(msg)
+
+        events.clear()
+        with pytest.raises(ValueError, match="oops"):
+            await raise_in_greeting_context()
+        assert events == ["enter", "handled", "exit"]
+
+    with injector.shared(Greeting, value=Greeting("Hi")):
+        iterator = greetings(1)
+        assert iterator.__name__ == "greetings"  # returned directly since nothing needs to be entered
+        assert [value async for value in iterator] == ["Hi 0"]
+
+
+async def test_provider_concurrency_limit():
+    active = 0
+    peak = 0
+
+    @provider.asynciterator(max_concurrent=2)
+    async def greeting() -> AsyncIterator[Greeting]:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        try:
+            await asyncio.sleep(0.01)
+            yield Greeting("Hello")
+        finally:
+            active -= 1
+
+    @injector.asyncfunction
+    async def use_greeting(*, greeting: Greeting = required) -> Greeting:
+        await asyncio.sleep(0.01)
+        return greeting
+
+    with greeting.scope():
+        assert await asyncio.gather(*[use_greeting() for _ in range(5)]) == ["Hello"] * 5
+
+    assert peak == 2
+    assert greeting.limiter is not None
+    assert greeting.limiter.active == 0
+    assert greeting.limiter.acquired == 5
+    assert greeting.limiter.max_waiting == 3
+
+
+async def test_provider_concurrency_limit_timeout():
+    @provider.function(max_concurrent=1, acquire_timeout=0.01)
+    def sync_greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @provider.asyncfunction(max_concurrent=1, acquire_timeout=0.01)
+    async def async_greeting() -> Greeting:
+        return Greeting("Hello")
+
+    def check_sync_timeout():
+        # run outside the event loop since sync providers refuse to block it
+        with sync_greeting.scope(), injector.current(Greeting):
+            with pytest.raises(ProviderTimeoutError, match=r"slots of provider .*sync_greeting"):
+                injector.current(Greeting).__enter__()
+            assert sync_greeting.limiter is not None
+            assert sync_greeting.limiter.timeouts == 1
+
+    await asyncio.to_thread(check_sync_timeout)
+
+    with async_greeting.scope():
+        async with injector.current(Greeting):
+            with pytest.raises(ProviderTimeoutError):
+                await injector.current(Greeting).__aenter__()
+
+
+async def test_limited_sync_provider_does_not_block_event_loop():
+    @provider.function(max_concurrent=1, acquire_timeout=10)
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.asyncfunction
+    async def use_greeting(*, greeting: Greeting = required) -> Greeting:
+        await asyncio.sleep(0.01)
+        return greeting
+
+    with greeting.scope():
+        results = await asyncio.gather(use_greeting(), use_greeting(), return_exceptions=True)
+    assert results[0] == "Hello"
+    assert isinstance(results[1], RuntimeError)
+    assert "would block the running event loop" in str(results[1])
+    assert greeting.limiter is not None
+    assert greeting.limiter.timeouts == 0
+
+
+async def test_provider_timeout_cancels_slow_initialization():
+    events = []
+
+    @provider.asynciterator(timeout=0.01)
+    async def greeting() -> AsyncIterator[Greeting]:
+        try:
+            await asyncio.sleep(10)
+            yield Greeting("Hello")  # nocov
+        finally:
+            events.append("greeting cleanup")
+
+    @injector.asyncfunction
+    async def use_greeting(*, _: Greeting = required):
+        raise AssertionError  # nocov
+
+    with greeting.scope(), pytest.raises(ProviderTimeoutError, match=r"entering provider .*greeting"):
+        await use_greeting()
+    assert events == ["greeting cleanup"]
+
+
+# these differ before Python 3.11
+@pytest.mark.parametrize("error_type", [TimeoutError, asyncio.TimeoutError])
+async def test_provider_timeout_does_not_rewrite_provider_timeout_errors(error_type):
+    @provider.asyncfunction(timeout=10)
+    async def greeting() -> Greeting:
+        msg = "upstream timed out"
+        raise error_type(msg)
+
+    @injector.asyncfunction
+    async def use_greeting(*, _: Greeting = required):
+        raise AssertionError  # nocov
+
+    with greeting.scope(), pytest.raises(error_type, match="upstream timed out") as exc_info:
+        await use_greeting()
+    assert not isinstance(exc_info.value, ProviderTimeoutError)
+
+
+async def test_provider_timeout_enters_provider_in_current_task():
+    tasks = []
+
+    @provider.asynciterator(timeout=10)
+    async def greeting() -> AsyncIterator[Greeting]:
+        tasks.append(asyncio.current_task())
+        yield Greeting("Hello")
+        tasks.append(asyncio.current_task())
+
+    @injector.asyncfunction(timeout=10)
+    async def use_greeting(*, greeting: Greeting = required) -> Greeting:
+        tasks.append(asyncio.current_task())
+        return greeting
+
+    with greeting.scope():
+        assert await use_greeting() == "Hello"
+    # entered and exited within the injecting task (and so its context)
+    assert tasks == [asyncio.current_task()] * 3
+
+
+async def test_provider_timeout_excludes_waiting_for_a_slot():
+    @provider.asyncfunction(max_concurrent=1, acquire_timeout=10, timeout=0.05)
+    async def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.asyncfunction
+    async def use_greeting(*, greeting: Greeting = required) -> Greeting:
+        await asyncio.sleep(0.2)
+        return greeting
+
+    with greeting.scope():
+        assert await asyncio.gather(use_greeting(), use_greeting()) == ["Hello", "Hello"]
+    assert greeting.limiter is not None
+    assert greeting.limiter.max_waiting == 1
+
+
+async def test_injection_deadline_unwinds_entered_providers():
+    events = []
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        events.append("greeting enter")
+        try:
+            yield Greeting("Hello")
+        finally:
+            events.append("greeting exit")
+
+    @provider.asyncfunction
+    async def recipient() -> Recipient:
+        await asyncio.sleep(10)
+        raise AssertionError  # nocov
+
+    @injector.asyncfunction(timeout=0.01)
+    async def use_both(*, _greeting: Greeting = required, _recipient: Recipient = required):
+        raise AssertionError  # nocov
+
+    with greeting.scope(), recipient.scope(), pytest.raises(ProviderTimeoutError, match=r"provider .*recipient"):
+        await use_both()
+    assert events == ["greeting enter", "greeting exit"]
+
+
+class Connection:
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self.closed = False
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_process_reinitializes_shared_value():
+    @provider.iterator(on_fork="reinit")
+    def connection() -> Iterator[Connection]:
+        conn = Connection(os.getpid())
+        try:
+            yield conn
+        finally:
+            conn.closed = True
+
+    @injector.function
+    def get_connection(*, conn: Connection = required) -> Connection:
+        return conn
+
+    with connection.scope(), injector.shared(Connection) as parent_conn:
+        pid = os.fork()
+        if pid == 0:  # nocov (runs in the child process)
+            child_conn = get_connection()
+            ok = child_conn is not parent_conn and child_conn.pid == os.getpid() and child_conn is get_connection()
+            os._exit(0 if ok and not parent_conn.closed else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert get_connection() is parent_conn
+    assert parent_conn.closed
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_process_reinitializes_shared_value_for_current():
+    @provider.iterator(on_fork="reinit")
+    def connection() -> Iterator[Connection]:
+        yield Connection(os.getpid())
+
+    @injector.function
+    def get_connection(*, conn: Connection = required) -> Connection:
+        return conn
+
+    with connection.scope(), injector.shared(Connection) as parent_conn:
+        pid = os.fork()
+        if pid == 0:  # nocov (runs in the child process)
+            with injector.current(Connection) as first, injector.current(Connection) as second:
+                pass
+            ok = first is not parent_conn and first is second is get_connection() and first.pid == os.getpid()
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+
+async def test_fork_behaviors_in_child_process():
+    # simulate what happens in a child process after forking
+    from pybooster._private._injector import _after_fork_in_child
+
+    events = []
+
+    @provider.iterator(on_fork="close")
+    def closed_connection() -> Iterator[Connection]:
+        conn = Connection(0)
+        events.append("open sync")
+        yield conn
+        events.append("close sync")
+
+    @provider.asynciterator(on_fork="reinit")
+    async def reinit_connection() -> AsyncIterator[Greeting]:
+        events.append("open async")
+        yield Greeting(f"conn-{len(events)}")
+        events.append("close async")
+
+    @injector.asyncfunction
+    async def get_values(*, sync_conn: Connection = required, async_conn: Greeting = required) -> tuple:
+        return sync_conn, async_conn
+
+    with closed_connection.scope(), reinit_connection.scope():
+        async with injector.shared(Connection) as parent_sync, injector.shared(Greeting) as parent_async:
+            assert await get_values() == (parent_sync, parent_async)
+            _after_fork_in_child()
+            assert events == ["open sync", "open async", "close sync"]
+            async with injector.current(Greeting) as current_conn:
+                assert current_conn != parent_async
+            sync_conn, async_conn = await get_values()
+            assert async_conn is current_conn
+            assert sync_conn is not parent_sync
+            assert async_conn != parent_async
+            assert injector.get(Greeting) == async_conn
+            assert (await get_values())[1] is async_conn
+        # the inherited async value is never torn down but the re-initialized one is
+        assert events.count("close async") == 1
+        assert injector.get(Greeting, None) is None
+
+
+async def test_forked_sync_value_is_reinitialized_once_by_threads_and_tasks():
+    from pybooster._private._injector import _after_fork_in_child
+
+    opened = []
+    entering = threading.Event()
+
+    @provider.iterator(on_fork="reinit")
+    def connection() -> Iterator[Connection]:
+        entering.set()
+        time.sleep(0.05)  # keep others waiting while the value is re-initialized
+        opened.append(conn := Connection(len(opened)))
+        yield conn
+
+    @injector.function
+    def sync_get(*, conn: Connection = required) -> Connection:
+        return conn
+
+    @injector.asyncfunction
+    async def async_get(*, conn: Connection = required) -> Connection:
+        return conn
+
+    with connection.scope():
+        async with injector.shared(Connection) as parent_conn:
+            _after_fork_in_child()
+            entering.clear()
+            results: list[Connection] = []
+            threads = [
+                threading.Thread(target=contextvars.copy_context().run, args=(lambda: results.append(sync_get()),))
+                for _ in range(4)
+            ]
+            for t in threads:
+                t.start()
+            entering.wait()
+            # a task joins while a thread is still re-initializing the value
+            child_conn = await async_get()
+            for t in threads:
+                t.join()
+            assert child_conn is not parent_conn
+            assert results == [child_conn] * 4
+            assert opened == [parent_conn, child_conn]
+
+
+def test_reloadable_value_is_released_after_last_user():
+    events = []
+    count = 0
+
+    @provider.iterator
+    def greeting() -> Iterator[Greeting]:
+        nonlocal count
+        count += 1
+        value = Greeting(f"Hello {count}")
+        events.append(f"open {value}")
+        yield value
+        events.append(f"close {value}")
+
+    @injector.iterator
+    def stream(*, greeting: Greeting = required) -> Iterator[Greeting]:
+        yield greeting
+
+    with greeting.scope(), injector.reloadable(Greeting) as slot:
+        assert slot.generation == 1
+        in_flight = stream()
+        assert next(in_flight) == "Hello 1"
+        assert slot.reload() == "Hello 2"
+        assert slot.generation == 2
+        # the in flight injection keeps its value which is kept open until it finishes
+        assert events == ["open Hello 1", "open Hello 2"]
+        assert next(stream()) == "Hello 2"
+        assert injector.get(Greeting) == "Hello 2"
+        with injector.current(Greeting) as current:
+            assert current == "Hello 2"
+        in_flight.close()
+        assert events == ["open Hello 1", "open Hello 2", "close Hello 1"]
+        slot.swap(Greeting("Hi"))
+        assert events[-1] == "close Hello 2"
+        assert next(stream()) == "Hi"
+    assert injector.get(Greeting, None) is None
+
+
+async def test_async_reloadable_value():
+    events = []
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        value = Greeting(f"Hello {len(events)}")
+        events.append(f"open {value}")
+        yield value
+        events.append(f"close {value}")
+
+    @injector.asyncfunction
+    async def get_greeting(*, greeting: Greeting = required) -> Greeting:
+        return greeting
+
+    in_use = asyncio.Event()
+    done = asyncio.Event()
+
+    @injector.asyncfunction
+    async def hold_greeting(*, greeting: Greeting = required) -> Greeting:
+        in_use.set()
+        await done.wait()
+        return greeting
+
+    with greeting.scope():
+        async with injector.reloadable(Greeting) as slot:
+            task = asyncio.create_task(hold_greeting())
+            await in_use.wait()
+            assert await slot.areload() == "Hello 1"
+            assert await get_greeting() == "Hello 1"
+            assert events == ["open Hello 0", "open Hello 1"]
+            done.set()
+            assert await task == "Hello 0"
+            assert events[-1] == "close Hello 0"
+        assert events[-1] == "close Hello 1"
+
+
+async def test_captured_environment_in_tasks_and_threads():
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.function
+    def get_message(*, greeting: Greeting = required, recipient: Recipient = required) -> Message:
+        return Message(f"{greeting}, {recipient}!")
+
+    @injector.asyncfunction
+    async def aget_message(*, greeting: Greeting = required, recipient: Recipient = required) -> Message:
+        await asyncio.sleep(0)
+        return Message(f"{greeting}, {recipient}!")
+
+    with greeting.scope(), injector.shared(Recipient, value=Recipient("World")):
+        env = injector.capture()
+
+    with pytest.raises(ProviderMissingError):
+        get_message()
+
+    tasks = [env.run(asyncio.create_task, aget_message()) for _ in range(3)]
+    assert await asyncio.gather(*tasks) == ["Hello, World!"] * 3
+
+    async def use_env() -> Message:
+        with env:
+            return await aget_message()
+
+    assert await asyncio.gather(*[use_env() for _ in range(3)]) == ["Hello, World!"] * 3
+    assert await asyncio.to_thread(env.run, get_message) == "Hello, World!"
+
+    with env, env:
+        assert get_message() == "Hello, World!"
+    with pytest.raises(ProviderMissingError):
+        get_message()
+
+
+@pytest.mark.parametrize("slots", [False, True])
+def test_class_injection(slots):
+    events = []
+
+    @provider.iterator
+    def greeting() -> Iterator[Greeting]:
+        events.append("open")
+        yield Greeting("Hello")
+        events.append("close")
+
+    class Base:
+        def __init__(self, punctuation: str) -> None:
+            self.punctuation = punctuation
+
+    @injector.cls(slots=slots)
+    class Greeter(Base):
+        greeting: Greeting = required
+        recipient: Recipient = required
+
+        def __init__(self, punctuation: str = "!") -> None:
+            super().__init__(punctuation)
+
+        def greet(self) -> str:
+            return f"{self.greeting}, {self.recipient}{self.punctuation}"
+
+    with greeting.scope(), injector.shared(Recipient, value=Recipient("World")):
+        greeter = Greeter()
+        assert events == ["open"]
+        assert greeter.greet() == "Hello, World!"
+        assert Greeter("?", greeting=Greeting("Hi")).greet() == "Hi, World?"
+    assert greeter.greet() == "Hello, World!"
+    assert ("greeting" in getattr(Greeter, "__slots__", ())) is slots
+    assert events == ["open"]
+    del greeter
+    assert events == ["open", "close"]
+
+
+def test_class_injection_rejects_unexpected_arguments():
+    @injector.cls
+    class Greeter:
+        greeting: Greeting = required
+
+    with pytest.raises(TypeError):
+        Greeter(1, 2, bogus=3, greeting=Greeting("Hello"))  # type: ignore[reportCallIssue]
+
+
+@pytest.mark.parametrize("slots", [False, True])
+def test_dataclass_injection(slots):
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    # other fields need slots of their own when the class is recreated with slots
+    @injector.cls(slots=slots)
+    @dataclass(slots=slots)
+    class Greeter:
+        recipient: str
+        greeting: Greeting = required
+        message: str = field(init=False)
+
+        def __post_init__(self) -> None:
+            self.message = f"{self.greeting}, {self.recipient}!"
+
+    with greeting.scope():
+        assert Greeter("World").message == "Hello, World!"
+    assert Greeter("Alice", greeting=Greeting("Hi")).message == "Hi, Alice!"
+
+    with pytest.raises(TypeError, match="cannot also be parameters"):
+
+        @injector.cls(lazy=True)
+        @dataclass
+        class LazyGreeter:
+            greeting: Greeting = required
+
+
+@pytest.mark.parametrize("slots", [False, True])
+def test_lazy_class_injection(slots):
+    calls = []
+
+    @provider.function
+    def greeting() -> Greeting:
+        calls.append("greeting")
+        return Greeting("Hello")
+
+    @injector.cls(lazy=True, slots=slots)
+    class Greeter:
+        greeting: Greeting = required
+
+    with pytest.raises(ProviderMissingError):
+        Greeter().greeting  # noqa: B018
+
+    greeter = Greeter()
+    with greeting.scope():
+        assert greeter.greeting == "Hello"
+        assert greeter.greeting == "Hello"
+    assert calls == ["greeting"]
+    assert Greeter(greeting=Greeting("Hi")).greeting == "Hi"
+
+
+def test_diagnostics_track_live_and_outlived_values():
+    class Buffer:
+        def __init__(self) -> None:
+            self.data = bytearray(1024)
+
+    @provider.iterator
+    def buffer() -> Iterator[Buffer]:
+        yield Buffer()
+
+    @injector.function
+    def get_buffer(*, buffer: Buffer = required) -> Buffer:
+        return buffer
+
+    with pytest.raises(RuntimeError):
+        diagnostics.report()
+
+    diagnostics.enable(trace_memory=True)
+    try:
+        with buffer.scope():
+            kept = get_buffer()
+            get_buffer()
+            with injector.shared(Buffer) as shared:
+                (report,) = diagnostics.report()
+                assert report.name == buffer.value.__qualname__
+                assert (report.live, report.outlived, report.created, report.exited) == (1, 1, 3, 2)
+                assert report.size >= 1024
+                live, leaked = sorted(diagnostics.values(), key=lambda r: r.exited)
+                assert (live.value, live.exited) == (shared, False)
+                assert (leaked.value, leaked.exited) == (kept, True)
+        del kept, shared, live, leaked
+        (report,) = diagnostics.report()
+        assert (report.live, report.outlived, report.created, report.exited) == (0, 0, 3, 3)
+        assert diagnostics.values() == []
+    finally:
+        diagnostics.disable()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+async def test_diagnostics_track_cached_values_once(use_async):
+    class Buffer:
+        def __init__(self) -> None:
+            self.data = bytearray(1024)
+
+    if use_async:
+
+        @provider.asyncfunction
+        async def buffer() -> Buffer:
+            return Buffer()
+
+    else:
+
+        @provider.function
+        def buffer() -> Buffer:
+            return Buffer()
+
+    @injector.asyncfunction
+    async def get_buffer(*, buffer: Buffer = required) -> Buffer:
+        return buffer
+
+    diagnostics.enable()
+    try:
+        async with buffer.cached_scope():
+            value = await get_buffer()
+            assert await get_buffer() is value
+            assert await get_buffer() is value
+            (report,) = diagnostics.report()
+            assert (report.live, report.outlived, report.created, report.exited) == (1, 0, 1, 0)
+        (report,) = diagnostics.report()
+        assert (report.live, report.outlived, report.created, report.exited) == (0, 1, 1, 1)
+        del value
+        assert diagnostics.values() == []
+    finally:
+        diagnostics.disable()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+async def test_callback_stack_matches_exit_stack(use_async):
+    from contextlib import AsyncExitStack
+    from contextlib import ExitStack
+    from contextlib import contextmanager
+    from contextlib import suppress
+
+    from pybooster._private._stack import AsyncCallbackStack
+    from pybooster._private._stack import CallbackStack
+
+    @contextmanager
+    def raises(exc: Exception) -> Iterator[None]:
+        try:
+            yield
+        finally:
+            raise exc
+
+    async def run(stack_type: type) -> tuple:
+        calls = []
+        msg = "body"
+        try:
+            stack = stack_type()
+            if use_async:
+                async with stack:
+                    stack.callback(calls.append, "callback")
+                    stack.enter_context(suppress(ValueError))
+                    stack.enter_context(raises(ValueError("inner")))
+                    stack.enter_context(raises(KeyError("outer")))
+                    stack.push_async_callback(asyncio.sleep, 0)
+                    raise RuntimeError(msg)  # noqa: TRY301
+            else:
+                with stack:
+                    stack.callback(calls.append, "callback")
+                    stack.enter_context(raises(ValueError("inner")))
+                    stack.enter_context(raises(KeyError("outer")))
+                    raise RuntimeError(msg)  # noqa: TRY301
+        except Exception as exc:  # noqa: BLE001
+            chain = []
+            while exc is not None:
+                chain.append(repr(exc))
+                exc = exc.__context__
+            return calls, chain
+        return calls, []
+
+    expected = await run(AsyncExitStack if use_async else ExitStack)
+    assert await run(AsyncCallbackStack if use_async else CallbackStack) == expected
+    assert expected[0] == ["callback"]
+
+
+@pytest.mark.skipif(tracemalloc.is_tracing(), reason="tracemalloc is already in use")
+def test_injection_allocations():
+    from contextlib import ExitStack
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.function
+    def get_greeting(*, greeting: Greeting = required) -> Greeting:
+        return greeting
+
+    def measure(call) -> tuple[int, int]:
+        call()  # warm up any caches
+        tracemalloc.start()
+        try:
+            peaks = []
+            for _ in range(5):
+                current = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                call()
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+            for _ in range(1000):
+                call()  # let one-off allocations (e.g. free lists) settle while tracing
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(1000):
+                call()
+            return min(peaks), tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+    with greeting.scope():
+        missing_peak, missing_retained = measure(get_greeting)
+        with injector.shared(Greeting):
+            shared_peak, shared_retained = measure(get_greeting)
+    exit_stack_peak, _ = measure(lambda: ExitStack().close())
+
+    # nothing accumulates across calls on either path
+    assert missing_retained < 1024
+    assert shared_retained < 1024
+    # the all-shared path enters nothing while entering a provider costs less than an ExitStack alone
+    assert shared_peak < missing_peak < shared_peak + exit_stack_peak
+
+
+async def test_asgi_middleware():
+    from pybooster.middleware import ASGIMiddleware
+
+    events = []
+
+    @asynccontextmanager
+    async def lifetime() -> AsyncIterator[None]:
+        events.append("startup")
+        yield
+        events.append("shutdown")
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @provider.asynciterator
+    async def message(*, greeting: Greeting = required) -> AsyncIterator[Message]:
+        events.append("request start")
+        yield Message(greeting)
+        events.append("request end")
+
+    @injector.asyncfunction
+    async def get_body(*, message: Message = required, recipient: Recipient = required) -> str:
+        return f"{message}, {recipient}!"
+
+    async def app(scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while (event := await receive())["type"] != "lifespan.shutdown":
+                await send({"type": f"{event['type']}.complete"})
+            await send({"type": "lifespan.shutdown.complete"})
+        else:
+            await send({"type": "http.response.body", "body": await get_body()})
+
+    middleware = ASGIMiddleware(
+        app,
+        scopes=[lifetime(), greeting.scope(), message.scope()],
+        values=lambda scope: {Recipient: Recipient(scope["path"])},
+        shared=[Message],
+    )
+
+    lifespan_events = asyncio.Queue()
+    await lifespan_events.put({"type": "lifespan.startup"})
+    sent = []
+    started = asyncio.Event()
+
+    async def send(message):
+        sent.append(message)
+        started.set()
+
+    lifespan = asyncio.create_task(
+        middleware({"type": "lifespan"}, lifespan_events.get, send), name="lifespan"  # type: ignore[reportArgumentType]
+    )
+    await asyncio.wait_for(started.wait(), 1)
+    assert sent == [{"type": "lifespan.startup.complete"}]
+    assert events == ["startup"]
+
+    sent.clear()
+    await middleware({"type": "http", "path": "World"}, lifespan_events.get, send)
+    await middleware({"type": "http", "path": "Alice"}, lifespan_events.get, send)
+    assert [m["body"] for m in sent] == ["Hello, World!", "Hello, Alice!"]
+    assert events == ["startup", *["request start", "request end"] * 2]
+
+    await lifespan_events.put({"type": "lifespan.shutdown"})
+    await asyncio.wait_for(lifespan, 1)
+    assert events[-1] == "shutdown"
+
+
+async def test_asgi_middleware_starts_once_without_lifespan():
+    from pybooster.middleware import ASGIMiddleware
+
+    events = []
+
+    @asynccontextmanager
+    async def lifetime() -> AsyncIterator[None]:
+        events.append("startup")
+        await asyncio.sleep(0.01)  # let the other first request arrive mid-startup
+        yield
+        events.append("shutdown")
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.asyncfunction
+    async def get_body(*, greeting: Greeting = required) -> str:
+        return greeting
+
+    async def app(_scope, _receive, send) -> None:
+        await send({"type": "http.response.body", "body": await get_body()})
+
+    middleware = ASGIMiddleware(app, scopes=[lifetime(), greeting.scope()])
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def request():
+        await middleware({"type": "http"}, asyncio.Queue().get, send)
+
+    # each request runs in its own task (and so its own context) like it would in a server
+    await asyncio.gather(request(), request())
+    assert [m["body"] for m in sent] == ["Hello", "Hello"]
+    assert events == ["startup"]
+    assert injector.get(Greeting, None) is None
+
+    await asyncio.create_task(middleware.shutdown())
+    assert events == ["startup", "shutdown"]
+
+
+def test_wsgi_middleware():
+    from pybooster.middleware import WSGIMiddleware
+
+    events = []
+
+    @contextmanager
+    def lifetime() -> Iterator[None]:
+        yield
+        events.append("shutdown")
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @provider.iterator
+    def message(*, greeting: Greeting = required) -> Iterator[Message]:
+        yield Message(greeting)
+        events.append("request end")
+
+    @injector.iterator
+    def app(_environ, start_response, *, recipient: Recipient = required) -> Iterator[bytes]:
+        start_response("200 OK", [])
+        yield f"{injector.get(Message)}, {recipient}!".encode()
+        yield f"{injector.get(Message)}, {recipient}!".encode()
+
+    middleware = WSGIMiddleware(
+        app,  # type: ignore[reportArgumentType]
+        scopes=[lifetime(), greeting.scope(), message.scope()],
+        values=lambda environ: {Recipient: Recipient(environ["PATH_INFO"])},
+        shared=[Message],
+    )
+
+    response = middleware({"PATH_INFO": "World"}, lambda *_: None)
+    assert list(response) == [b"Hello, World!"] * 2
+    assert events == []
+    response.close()  # type: ignore[reportAttributeAccessIssue]
+    assert events == ["request end"]
+    with pytest.raises(ProviderMissingError):
+        injector.get(Message)
+    middleware.close()
+    assert events == ["request end", "shutdown"]
+
+
+REQUEST_ID: contextvars.ContextVar[str] = contextvars.ContextVar("REQUEST_ID", default="unset")
+
+
+def test_wsgi_middleware_keeps_outer_context():
+    from pybooster.middleware import WSGIMiddleware
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @injector.iterator
+    def app(_environ, start_response, *, greeting: Greeting = required) -> Iterator[bytes]:
+        start_response("200 OK", [])
+        yield f"{greeting} {REQUEST_ID.get()}".encode()
+
+    # providers made available around the middleware's creation are used by its requests
+    with greeting.scope():
+        middleware = WSGIMiddleware(app)  # type: ignore[reportArgumentType]
+
+    # as are context variables the server (or an outer middleware) set for the request
+    def serve() -> list[bytes]:
+        REQUEST_ID.set("abc")
+        response = middleware({}, lambda *_: None)
+        try:
+            return list(response)
+        finally:
+            response.close()  # type: ignore[reportAttributeAccessIssue]
+
+    assert contextvars.copy_context().run(serve) == [b"Hello abc"]
+    middleware.close()
+
+
+def test_bridge_sync_injector_uses_async_provider():
+    loops = []
+    events = []
+
+    @provider.asynciterator
+    async def greeting(*, recipient: Recipient = required) -> AsyncIterator[Greeting]:
+        loops.append(asyncio.get_running_loop())
+        yield Greeting(f"Hello, {recipient}")
+        events.append("exit")
+
+    @injector.function
+    def get_greeting(*, greeting: Greeting = required) -> Greeting:
+        return greeting
+
+    @provider.function
+    def recipient() -> Recipient:
+        return Recipient("World")
+
+    with recipient.scope(), greeting.scope():
+        with pytest.raises(ProviderMissingError):
+            get_greeting()
+        with injector.bridge():
+            assert get_greeting() == "Hello, World"
+            with injector.shared(Recipient, Recipient("Alice")):
+                assert get_greeting() == "Hello, Alice"
+            with injector.shared(Greeting) as shared_greeting:
+                assert get_greeting() is shared_greeting
+            assert events == ["exit"] * 3
+        with pytest.raises(ProviderMissingError):
+            get_greeting()
+
+    assert len(loops) == 3
+    assert len(set(loops)) == 1
+    assert loops[0].is_closed()
+
+
+def test_bridge_propagates_errors_to_async_provider():
+    handled = []
+
+    @provider.asynciterator
+    async def message() -> AsyncIterator[Message]:
+        try:
+            yield Message("Hello")
+        except ValueError as error:
+            handled.append(str(error))
+            raise
+
+    @injector.function
+    def fail(*, message: Message = required) -> None:
+        raise ValueError(message)
+
+    with message.scope(), injector.bridge(), pytest.raises(ValueError, match="Hello"):
+        fail()
+    assert handled == ["Hello"]
+
+
+def test_cached_scope_reuses_sync_value_until_exit():
+    events = []
+
+    @provider.iterator
+    def greeting() -> Iterator[Greeting]:
+        events.append("enter")
+        time.sleep(0.01)  # give other threads a chance to race
+        yield Greeting("Hello")
+        events.append("exit")
+
+    @injector.function
+    def get_greeting(*, greeting: Greeting = required) -> Greeting:
+        return greeting
+
+    with greeting.cached_scope():
+        assert events == []
+        env = injector.capture()
+        threads = [threading.Thread(target=env.run, args=(get_greeting,)) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert get_greeting() == "Hello"
+        assert events == ["enter"]
+    assert events == ["enter", "exit"]
+
+    with pytest.raises(RuntimeError, match="scope has exited"):
+        env.run(get_greeting)
+
+
+async def test_cached_scope_reuses_async_value_until_exit():
+    events = []
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        events.append("enter")
+        await asyncio.sleep(0.01)  # give other tasks a chance to race
+        yield Greeting("Hello")
+        events.append("exit")
+
+    @injector.asyncfunction
+    async def get_greeting(*, greeting: Greeting = required) -> Greeting:
+        return greeting
+
+    with pytest.raises(RuntimeError, match="async with"), greeting.cached_scope():
+        pass
+
+    async with greeting.cached_scope():
+        assert await asyncio.gather(*[get_greeting() for _ in range(5)]) == ["Hello"] * 5
+        assert events == ["enter"]
+    assert events == ["enter", "exit"]
+
+    async with greeting.cached_scope():
+        pass  # unused values are never created
+    assert events == ["enter", "exit"]
+
+
+async def test_override_layers_replacements_on_active_providers():
+    from pybooster._private._provider import get_provider_registry
+
+    class Base:
+        pass
+
+    class Sub(Base):
+        pass
+
+    @provider.function
+    def greeting() -> Greeting:
+        return Greeting("Hello")
+
+    @provider.function
+    def recipient() -> Recipient:
+        return Recipient("World")
+
+    @provider.function
+    def base() -> Base:
+        return Base()
+
+    @provider.function
+    def message(*, greeting: Greeting = required, recipient: Recipient = required) -> Message:
+        return Message(f"{greeting}, {recipient}!")
+
+    @provider.asyncfunction
+    async def fake_message(*, recipient: Recipient = required) -> Message:
+        return Message(f"Fake, {recipient}!")
+
+    @injector.asyncfunction
+    async def get_message(*, message: Message = required) -> Message:
+        return message
+
+    @injector.function
+    def get_base(*, base: Base = required) -> Base:
+        return base
+
+    sub = Sub()
+    with greeting.scope(), recipient.scope(), message.scope(), base.scope():
+        outer = get_provider_registry()
+        assert await get_message() == "Hello, World!"
+        with provider.override({Recipient: Recipient("Alice")}):
+            assert get_provider_registry().parent is outer
+            assert await get_message() == "Hello, Alice!"
+            async with provider.override({Message: fake_message, Sub: sub}):
+                assert await get_message() == "Fake, Alice!"
+                assert get_base() is sub
+                with recipient.scope():
+                    # scopes within an override take precedence over it
+                    assert await get_message() == "Fake, World!"
+        assert await get_message() == "Hello, World!"
+        assert type(get_base()) is Base
+
+
+def test_override_checks_dependencies_of_replacements():
+    @provider.function
+    def message(*, greeting: Greeting = required) -> Message:
+        return Message(greeting)
+
+    with pytest.raises(ProviderMissingError), provider.override({Message: message}):
+        pass
+    with provider.override({Greeting: Greeting("Hello"), Message: message}), injector.current(Message) as value:
+        assert value == "Hello"
+
+
+def _read_shared_payload(handle) -> bytes:
+    with handle.scope(), injector.current(Payload) as payload:
+        return bytes(payload)
+
+
+def test_sharedmemory_provider_shares_value_with_other_processes():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    calls = []
+
+    @provider.sharedmemory
+    def payload(*, greeting: Greeting = required) -> Payload:
+        calls.append(greeting)
+        return Payload(memoryview(f"{greeting}, World!".encode()))
+
+    @injector.function
+    def get_payload(*, payload: Payload = required) -> Payload:
+        return payload
+
+    with provider.override({Greeting: Greeting("Hello")}), payload.scope() as handle:
+        first, second = get_payload(), get_payload()
+        assert isinstance(first, memoryview)
+        assert first.readonly
+        assert bytes(first) == bytes(second) == b"Hello, World!"
+        assert calls == ["Hello"]
+
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            assert pool.submit(_read_shared_payload, handle).result() == b"Hello, World!"
+
+    assert handle.segment.path is not None
+    assert not os.path.exists(handle.segment.path)  # noqa: PTH110
+
+
+def test_sharedmemory_provider_shares_numpy_arrays():
+    np = pytest.importorskip("numpy")
+
+    @provider.sharedmemory(provides=Payload)
+    def payload():
+        return np.arange(6, dtype="int32").reshape(2, 3)
+
+    with payload.scope(), injector.current(Payload) as value:
+        assert value.shape == (2, 3)
+        assert not value.flags.writeable
+        assert value.tolist() == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_sharedmemory_provider_rejects_other_values():
+    @provider.sharedmemory(provides=Payload)
+    def payload():
+        return {"not": "bytes"}
+
+    with pytest.raises(TypeError, match="bytes-like"), payload.scope():
+        pass
+
+
+async def test_current_context_can_be_shared_by_concurrent_tasks():
+    exits = []
+    count = 0
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        nonlocal count
+        count += 1
+        name = Greeting(f"greeting {count}")
+        yield name
+        exits.append(name)
+
+    current_greeting = injector.current(Greeting)
+    a_entered, b_entered, a_exited = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    async def task_a():
+        async with current_greeting as value:
+            a_entered.set()
+            await b_entered.wait()
+        a_exited.set()
+        return value
+
+    async def task_b():
+        await a_entered.wait()
+        async with current_greeting as value:
+            b_entered.set()
+            await a_exited.wait()
+            # exiting in task A must not have torn down task B's value
+            assert exits == ["greeting 1"]
+        return value
+
+    async with greeting.scope():
+        assert await asyncio.gather(task_a(), task_b()) == ["greeting 1", "greeting 2"]
+    assert exits == ["greeting 1", "greeting 2"]
+
+    with pytest.raises(RuntimeError, match="not entered"):
+        await current_greeting.__aexit__(None, None, None)
+
+
+async def test_current_context_can_be_exited_by_another_task():
+    exits = []
+
+    @provider.asynciterator
+    async def greeting() -> AsyncIterator[Greeting]:
+        yield Greeting("Hello")
+        exits.append("greeting")
+
+    current_greeting = injector.current(Greeting)
+
+    # like an async generator fixture whose setup and teardown run in different tasks
+    async with greeting.scope():
+        assert await asyncio.create_task(current_greeting.__aenter__()) == "Hello"
+        await asyncio.create_task(current_greeting.__aexit__(None, None, None))
+        assert exits == ["greeting"]
+
+        # the entering task still sees its entry but does not exit it a second time
+        async def enter_then_exit_elsewhere():
+            await current_greeting.__aenter__()
+            await asyncio.create_task(current_greeting.__aexit__(None, None, None))
+            async with current_greeting:
+                pass
+
+        await enter_then_exit_elsewhere()
+        assert exits == ["greeting"] * 3